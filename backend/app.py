@@ -1,43 +1,265 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, abort, g, request, jsonify
 from flask_cors import CORS
 import os
 import json
+import shutil
+import sqlite3
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
-from pathlib import Path
 
-# base NLP model
-from nlp_model import extract_details_from_file  
+# shared model registry + base NLP model
+import metrics
+import models
+from nlp_model import load_document, pipeline_version
+from result_cache import ResultCache, content_hash
+from result_store import RESULTS_DB, ResultStore
+from search_index import SEARCH_DB, SearchIndex
+from artifacts import ARTIFACTS_DB, ARTIFACTS_ENABLED, ArtifactStore
+import near_duplicates
+from near_duplicates import NEAR_DUP_DB, NearDuplicateIndex
 
-# other extractors
-from certificate_extracter import extract_certifications
-from dob_location_language_extractor import extract_dob, extract_location, extract_languages
-from linkedin_website_extractor import extract_linkedin, extract_websites
-from misc_extractor import extract_is_resume_probability, extract_redacted_text
-from objective_proffession_summary_extractor import extract_objective, extract_profession, extract_summary
-from publications_reference_extractor import extract_publications, extract_referees
-from work_experience import extract_total_experience, extract_work_experience
+# base + other extractors, merged
+from pipeline import parse_document, reuse_near_duplicate, section_hashes, stream_document
+from objective_proffession_summary_extractor import extract_summary
+import batch
+from extractors import merge, resolve_fields
+from jobs import JobQueue, QueueFull
+from summarizers import DEFAULT_SUMMARIZER, get_summarizer
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
-PARSED_FOLDER = 'parsed_data'
+CACHE_FOLDER = os.environ.get('CV_PARSER_CACHE_DIR', 'cache')
+CACHE_MAX_ENTRIES = int(os.environ.get('CV_PARSER_CACHE_MAX_ENTRIES', '10000'))
+JOBS_DB = os.environ.get('CV_PARSER_JOBS_DB', 'jobs.sqlite3')
+JOBS_SPOOL_FOLDER = os.environ.get('CV_PARSER_JOBS_SPOOL_DIR', 'job_spool')
+JOB_WORKERS = int(os.environ.get('CV_PARSER_JOB_WORKERS', '2'))
+JOB_QUEUE_MAX_DEPTH = int(os.environ.get('CV_PARSER_JOB_QUEUE_MAX_DEPTH', '1000'))
+# Add a Server-Timing header to every response (or per request with ?timing=1)
+SERVER_TIMING = os.environ.get('CV_PARSER_SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+SUMMARY_WORKERS = int(os.environ.get('CV_PARSER_SUMMARY_WORKERS', '2'))
+# Keep a copy of every upload in UPLOAD_FOLDER (written in the background;
+# parsing itself works on the in-memory bytes)
+PERSIST_UPLOADS = os.environ.get('CV_PARSER_PERSIST_UPLOADS', '1').lower() not in ('0', 'false', 'no')
+# Reuse the model-based fields of a near-duplicate CV parsed before (opt out per request with ?near_duplicates=0)
+NEAR_DUPLICATES = os.environ.get('CV_PARSER_NEAR_DUP', '1').lower() not in ('0', 'false', 'no')
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'pptx', 'txt'}
+# Largest accepted request body (413 above it), and largest single file in a batch zip
+MAX_UPLOAD_MB = float(os.environ.get('CV_PARSER_MAX_UPLOAD_MB', '10'))
+# Batch requests: the body, and the uncompressed size of every file in it (zips unpacked)
+MAX_BATCH_UPLOAD_MB = float(os.environ.get('CV_PARSER_MAX_BATCH_UPLOAD_MB', '200'))
+# Files in one batch request, zip members included
+MAX_BATCH_FILES = int(os.environ.get('CV_PARSER_MAX_BATCH_FILES', '1000'))
 
 app = Flask(__name__)
 CORS(app)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Hard cap for every request; single-file endpoints are held to MAX_UPLOAD_MB in check_upload_size
+app.config['MAX_CONTENT_LENGTH'] = int(max(MAX_UPLOAD_MB, MAX_BATCH_UPLOAD_MB) * 1024 * 1024)
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(PARSED_FOLDER, exist_ok=True)
+
+result_cache = ResultCache(CACHE_FOLDER, pipeline_version, max_entries=CACHE_MAX_ENTRIES)
+search_index = SearchIndex(SEARCH_DB)
+# Every full parse result, appended in batches (replaces the per-file JSON in parsed_data/)
+result_store = ResultStore(RESULTS_DB, pipeline_version)
+# Page texts / Docs / NER output per content hash, for `python artifacts.py rerun`
+artifact_store = ArtifactStore(ARTIFACTS_DB) if ARTIFACTS_ENABLED else None
+# MinHash signatures of every parsed CV text, for near-duplicate lookups
+near_index = NearDuplicateIndex(NEAR_DUP_DB)
+
+def index_result(digest, parsed_data, text=None, filename=None):
+    try:
+        search_index.add(digest, parsed_data, text=text, filename=filename)
+    except Exception as e:
+        app.logger.warning("Search indexing failed for %s: %s", filename or digest, e)
+
+def save_artifacts(digest, pdoc):
+    if artifact_store is None:
+        return
+    try:
+        artifact_store.save(digest, pdoc)
+    except Exception as e:
+        app.logger.warning("Saving artifacts failed for %s: %s", pdoc.source or digest, e)
+
+def cache_result(digest, parsed_data, variant=''):
+    # A field that timed out may well finish next time: do not pin that result
+    if not any(reason.endswith('timeout') for reason in parsed_data.get('field_errors', {}).values()):
+        result_cache.put(digest, parsed_data, variant)
+
+def store_result(digest, parsed_data, filename=None):
+    """Cache a full parse result, append it to the result store and index it for search."""
+    cache_result(digest, parsed_data)
+    result_store.append(digest, parsed_data, filename=filename)
+    index_result(digest, parsed_data, filename=filename)
+
+job_queue = JobQueue(JOBS_DB, JOBS_SPOOL_FOLDER, workers=JOB_WORKERS,
+                     max_depth=JOB_QUEUE_MAX_DEPTH, on_done=store_result)
+# Deferred summaries run here after the rest of the parse has been returned
+summary_executor = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS)
+# Upload copies / search index updates are written off the request path
+writer_executor = ThreadPoolExecutor(max_workers=1)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _write_file(path, data):
+    try:
+        with open(path, 'wb') as f:
+            f.write(data)
+    except OSError as e:
+        app.logger.warning("Could not write %s: %s", path, e)
+
+def persist_upload(filename, data):
+    if PERSIST_UPLOADS:
+        writer_executor.submit(_write_file, os.path.join(app.config['UPLOAD_FOLDER'], filename), data)
+
+@app.before_request
+def start_timing():
+    if not metrics.ENABLED:
+        return
+    g.request_start = time.perf_counter()
+    # Worker threads are reused across requests: never inherit a previous collector
+    metrics.stop_collecting()
+    if SERVER_TIMING or request.args.get('timing') == '1':
+        g.stage_timings = metrics.collect_timings()
+
+@app.after_request
+def finish_timing(response):
+    if not metrics.ENABLED or 'request_start' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_start
+    metrics.observe("request_seconds", elapsed, endpoint=request.endpoint or 'unknown')
+    timings = g.get('stage_timings')
+    if timings is not None:
+        header = metrics.server_timing_header(timings)
+        total = f"total;dur={elapsed * 1000:.1f}"
+        response.headers['Server-Timing'] = f"{header}, {total}" if header else total
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.before_request
+def check_upload_size():
+    if request.endpoint != 'parse_cv_batch' and (request.content_length or 0) > MAX_UPLOAD_MB * 1024 * 1024:
+        abort(413)
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    if request.endpoint == 'parse_cv_batch':
+        limit = f"{MAX_BATCH_UPLOAD_MB:g} MB uncompressed, {MAX_BATCH_FILES} files"
+    else:
+        limit = f"{MAX_UPLOAD_MB:g} MB"
+    return jsonify({"error": f"Upload too large (limit {limit})"}), 413
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({"status": "Backend is running"}), 200
 
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.stats()), 200
+
+def wants_summary(fields):
+    return fields is None or 'summary' in fields
+
+def cache_variant(summarizer_name, fields=None):
+    """
+    Result-cache variant for a summariser and field selection; the deployment
+    default summariser with every field is ''.
+    """
+    parts = []
+    if wants_summary(fields) and summarizer_name != get_summarizer(DEFAULT_SUMMARIZER).name:
+        parts.append(f'summarizer={summarizer_name}')
+    if fields is not None:
+        parts.append('fields=' + ','.join(fields))
+    return '|'.join(parts)
+
+def cached_result(digest, summarizer_name, fields=None):
+    """A cached result for these options, or the requested fields of a cached full result."""
+    result = result_cache.get(digest, cache_variant(summarizer_name, fields))
+    if result is None and fields is not None:
+        full = result_cache.get(digest, cache_variant(summarizer_name))
+        if full is not None:
+            result = {k: v for k, v in full.items() if k in fields or k == 'error'}
+    return result
+
+def request_options():
+    """(summarizer name, field selection) from the query string; ValueError if invalid."""
+    summarizer_name = get_summarizer(request.args.get('summarizer')).name
+    fields = resolve_fields(request.args.get('fields'), request.args.get('profile'))
+    return summarizer_name, fields
+
+def _finish_summary(pdoc, parsed_data, digest, summarizer_name, fields=None):
+    try:
+        parsed_data["summary"] = extract_summary(pdoc.raw_text, pdoc.doc, summarizer_name)
+    except Exception as e:
+        app.logger.warning("Deferred summary failed for %s: %s", pdoc.source, e)
+        parsed_data["summary"] = None
+        parsed_data.setdefault("field_errors", {})["summary"] = "error"
+    cache_result(digest, parsed_data, cache_variant(summarizer_name, fields))
+    if fields is None:
+        result_store.append(digest, parsed_data, filename=pdoc.source)
+    save_artifacts(digest, pdoc)
+
+def add_signature(digest, sig, filename=None, sections=None):
+    try:
+        near_index.add(digest, sig, filename, sections)
+    except sqlite3.Error as e:
+        app.logger.warning("Near-duplicate indexing failed for %s: %s", filename or digest, e)
+
+def near_duplicate_of(digest, sig):
+    """
+    (result_id, similarity, prior full result, its section hashes) of a
+    near-duplicate parsed before, or None.
+    """
+    try:
+        match = near_index.find(sig, exclude=digest)
+        prior_sections = near_index.sections(match[0]) if match is not None else None
+    except sqlite3.Error as e:
+        app.logger.warning("Near-duplicate lookup failed: %s", e)
+        return None
+    if prior_sections is None:
+        return None
+    prior_id, similarity = match
+    # The cache has results appended moments ago; the store everything of this version
+    prior = result_cache.get(prior_id) or result_store.latest(prior_id, pipeline_version())
+    if prior is None or 'error' in prior or 'field_errors' in prior:
+        return None
+    return prior_id, similarity, prior, prior_sections
+
+@app.route('/api/results/<digest>', methods=['GET'])
+def get_result(digest):
+    """Cached result for a content hash, e.g. to collect a deferred summary."""
+    try:
+        summarizer_name, fields = request_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = cached_result(digest, summarizer_name, fields)
+    if result is None and not cache_variant(summarizer_name):
+        # Evicted from the cache: the store keeps every result of this pipeline version
+        result = result_store.latest(digest, pipeline_version())
+        if result is not None and fields is not None:
+            result = {k: v for k, v in result.items() if k in fields or k == 'error'}
+    if result is None:
+        return jsonify({"error": "No result (yet) for this file", "result_id": digest}), 404
+    return jsonify({"result_id": digest, "parsed_data": result}), 200
+
 @app.route('/api/parse-cv', methods=['POST'])
 def parse_cv():
+    """
+    Query options:
+      summarizer=textrank|bart|bart-onnx|none   summary backend (default: CV_PARSER_SUMMARIZER)
+      defer_summary=1   return without the summary; it is computed afterwards
+                        and served by GET /api/results/<result_id>
+      fields=name,email,...             compute only these fields
+      profile=contact|no-summary|full   a named field selection (default: full)
+      near_duplicates=0                 parse in full even if a near-duplicate CV was parsed before
+    """
     if 'file' not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
 
@@ -48,53 +270,357 @@ def parse_cv():
     if not allowed_file(file.filename):
         return jsonify({"error": "Invalid file format. Allowed: pdf, docx, pptx, txt"}), 400
 
+    try:
+        summarizer_name, fields = request_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    defer_summary = request.args.get('defer_summary', '').lower() in ('1', 'true', 'yes')
+    check_near_duplicates = NEAR_DUPLICATES and request.args.get('near_duplicates', '1').lower() not in ('0', 'false', 'no')
+
     try:
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-
-        # --- Step 1: Run base extractor ---
-        parsed_data = extract_details_from_file(filepath)
-
-        # --- Step 2: Load raw text for other extractors ---
-        from nlp_model import load_text
-        raw_text = load_text(Path(filepath))  # <-- FIXED HERE
-
-        # --- Step 3: Call other extractors ---
-        extra_data = {
-            "certifications": extract_certifications(raw_text),
-            "date_of_birth": extract_dob(raw_text),
-            "location": extract_location(raw_text),
-            "languages": extract_languages(raw_text),
-            "linkedin": extract_linkedin(raw_text),
-            "websites": extract_websites(raw_text),
-            "is_resume_probability": extract_is_resume_probability(raw_text),
-            "redacted_text": extract_redacted_text(raw_text),
-            "objective": extract_objective(raw_text),
-            "profession": extract_profession(raw_text),
-            "summary": extract_summary(raw_text),
-            "publications": extract_publications(raw_text),
-            "referees": extract_referees(raw_text),
-            "total_experience": extract_total_experience(raw_text),
-            "work_experience": extract_work_experience(raw_text),
-        }
-
-        # --- Step 4: Merge all results ---
-        parsed_data.update(extra_data)
-
-        # Save JSON (optional)
-        json_filename = filename.rsplit('.', 1)[0] + '.json'
-        with open(os.path.join(PARSED_FOLDER, json_filename), 'w', encoding='utf-8') as f:
-            json.dump(parsed_data, f, indent=4)
+        data = file.read()
+
+        # --- Step 0: Same bytes parsed before by this pipeline version? ---
+        digest = content_hash(data)
+        variant = cache_variant(summarizer_name, fields)
+        cached = cached_result(digest, summarizer_name, fields)
+        if cached is not None:
+            return jsonify({
+                "message": "File parsed successfully",
+                "filename": filename,
+                "cached": True,
+                "result_id": digest,
+                "parsed_data": cached
+            }), 200
+
+        persist_upload(filename, data)
+
+        # --- Step 1: Read the upload from memory and parse it once, then run every extractor ---
+        pdoc = load_document(data, filename=filename)
+
+        # --- Step 2: A near-duplicate of a CV parsed before? Reuse its model-based fields ---
+        sig = near_duplicates.signature(pdoc.raw_text) if NEAR_DUPLICATES else None
+        if sig is not None:
+            writer_executor.submit(add_signature, digest, sig, filename, section_hashes(pdoc))
+        near = near_duplicate_of(digest, sig) if check_near_duplicates and sig is not None and not variant else None
+        if near is not None:
+            prior_id, similarity, prior, prior_sections = near
+            parsed_data, changes, reused = reuse_near_duplicate(
+                pdoc, prior, prior_sections, summarizer=summarizer_name)
+            # Only a record without copied fields counts as a full parse: the
+            # others are neither cached nor stored, so ?near_duplicates=0 can
+            # still parse the file in full
+            if not reused:
+                cache_result(digest, parsed_data)
+                result_store.append(digest, parsed_data, filename=filename)
+                writer_executor.submit(index_result, digest, parsed_data, pdoc.raw_text, filename)
+            writer_executor.submit(save_artifacts, digest, pdoc)
+            return jsonify({
+                "message": "File parsed successfully",
+                "filename": filename,
+                "cached": False,
+                "result_id": digest,
+                "near_duplicate": {
+                    "of": prior_id,
+                    "similarity": round(similarity, 4),
+                    "changed": changes,
+                    "reused": reused,
+                },
+                "parsed_data": parsed_data
+            }), 200
+
+        if defer_summary and summarizer_name != 'none' and wants_summary(fields):
+            parsed_data = parse_document(pdoc, summarizer='none', fields=fields)
+            summary_executor.submit(_finish_summary, pdoc, dict(parsed_data), digest, summarizer_name, fields)
+            if fields is None:
+                writer_executor.submit(index_result, digest, parsed_data, pdoc.raw_text, filename)
+            return jsonify({
+                "message": "File parsed successfully; summary pending",
+                "filename": filename,
+                "cached": False,
+                "result_id": digest,
+                "summary_pending": True,
+                "parsed_data": parsed_data
+            }), 200
+
+        parsed_data = parse_document(pdoc, summarizer=summarizer_name, fields=fields)
+
+        cache_result(digest, parsed_data, variant)
+        writer_executor.submit(save_artifacts, digest, pdoc)
+        if fields is None:
+            result_store.append(digest, parsed_data, filename=filename)
+            writer_executor.submit(index_result, digest, parsed_data, pdoc.raw_text, filename)
 
         return jsonify({
             "message": "File parsed successfully",
             "filename": filename,
+            "cached": False,
+            "result_id": digest,
             "parsed_data": parsed_data
         }), 200
 
     except Exception as e:
         return jsonify({"error": f"Failed to parse file: {str(e)}"}), 500
 
+@app.route('/api/parse-cv/stream', methods=['POST'])
+def parse_cv_stream():
+    """
+    Like /api/parse-cv (same file field and query options), but streams
+    newline-delimited JSON events as the extractors finish:
+      {"event": "started", "filename", "result_id"}
+      {"event": "field", "field": ..., "value": ...}     one per field, completion order
+                                                          (+ "reason" when the field failed)
+      {"event": "done", "cached", "result_id", "parsed_data"}   the merged record
+      {"event": "error", "error": ...}                    if the parse fails
+    """
+    if 'file' not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+
+    if not allowed_file(file.filename):
+        return jsonify({"error": "Invalid file format. Allowed: pdf, docx, pptx, txt"}), 400
+
+    try:
+        summarizer_name, fields = request_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filename = secure_filename(file.filename)
+    data = file.read()
+    digest = content_hash(data)
+    variant = cache_variant(summarizer_name, fields)
+    cached = cached_result(digest, summarizer_name, fields)
+
+    def event(**kwargs):
+        return json.dumps(kwargs) + '\n'
+
+    def generate():
+        yield event(event="started", filename=filename, result_id=digest)
+        if cached is not None:
+            yield event(event="done", cached=True, result_id=digest, parsed_data=cached)
+            return
+        try:
+            persist_upload(filename, data)
+            pdoc = load_document(data, filename=filename)
+            results, errors = {}, {}
+            for field, value in stream_document(pdoc, summarizer=summarizer_name, fields=fields, errors=errors):
+                results[field] = value
+                if field in errors:
+                    yield event(event="field", field=field, value=value, reason=errors[field])
+                else:
+                    yield event(event="field", field=field, value=value)
+            parsed_data = merge(pdoc, results, fields, errors)
+        except Exception as e:
+            yield event(event="error", error=f"Failed to parse file: {str(e)}")
+            return
+        cache_result(digest, parsed_data, variant)
+        if fields is None:
+            result_store.append(digest, parsed_data, filename=filename)
+            writer_executor.submit(index_result, digest, parsed_data, pdoc.raw_text, filename)
+        writer_executor.submit(save_artifacts, digest, pdoc)
+        yield event(event="done", cached=False, result_id=digest, parsed_data=parsed_data)
+
+    # X-Accel-Buffering: stop nginx from holding the events back
+    return Response(generate(), mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
+
+def _spool(file):
+    """
+    Copy of an uploaded file that outlives the request: Flask closes the
+    request's own files when the view returns, before a streamed response
+    has read them.
+    """
+    spool = tempfile.TemporaryFile()
+    shutil.copyfileobj(file.stream, spool)
+    spool.seek(0)
+    return spool
+
+def _batch_entries(files, spools):
+    """
+    (filename, read) for every supported file in the upload, unpacking
+    zips. Sizes come from the zip directories, so nothing is decompressed
+    before read() is called. The uploads are copied to temporary files,
+    appended to `spools` for the caller to close. Aborts with 413 once the
+    upload holds more than MAX_BATCH_FILES files or their uncompressed sizes
+    add up to more than MAX_BATCH_UPLOAD_MB.
+    """
+    entries = []
+    count = total = 0
+
+    def admit(files=0, size=0):
+        nonlocal count, total
+        count += files
+        total += size
+        if count > MAX_BATCH_FILES or total > MAX_BATCH_UPLOAD_MB * 1024 * 1024:
+            abort(413)
+
+    for file in files:
+        if not file.filename:
+            continue
+        is_zip = file.filename.lower().endswith('.zip')
+        if not is_zip and not allowed_file(file.filename):
+            continue
+        spool = _spool(file)
+        spools.append(spool)
+        if is_zip:
+            zf = zipfile.ZipFile(spool)
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                # Every member counts: a zip of many tiny files is refused as well
+                admit(files=1)
+                name = secure_filename(os.path.basename(info.filename))
+                if not name or not allowed_file(name):
+                    continue
+                # Uncompressed size: a small zip can expand to far more than the upload limit.
+                # zipfile never returns more than this for a member, whatever its data says.
+                if info.file_size > MAX_UPLOAD_MB * 1024 * 1024:
+                    app.logger.warning("Skipping %s in %s: larger than %s MB", name, file.filename, MAX_UPLOAD_MB)
+                    continue
+                admit(size=info.file_size)
+                entries.append((name, lambda zf=zf, info=info: zf.read(info)))
+        else:
+            admit(files=1, size=os.fstat(spool.fileno()).st_size)
+            entries.append((secure_filename(file.filename), spool.read))
+    return entries
+
+@app.route('/api/parse-cv/batch', methods=['POST'])
+def parse_cv_batch():
+    """
+    Parse many CVs (several 'files' parts and/or zip archives) on the batch
+    process pool. Streams one JSON object per line as each file finishes.
+    Files are read (zip members decompressed) as the workers need them.
+    """
+    files = request.files.getlist('files') + request.files.getlist('file')
+    if not files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    spools = []
+
+    def close_spools():
+        for spool in spools:
+            spool.close()
+
+    try:
+        entries = _batch_entries(files, spools)
+    except zipfile.BadZipFile:
+        close_spools()
+        return jsonify({"error": "Invalid zip archive"}), 400
+    except BaseException:
+        close_spools()
+        raise
+    if not entries:
+        close_spools()
+        return jsonify({"error": "No supported files. Allowed: pdf, docx, pptx, txt or a zip of them"}), 400
+
+    # The bytes go to the workers directly; no copy of the upload is saved
+    digests = {}
+    cached = []
+
+    def pending():
+        for filename, read in entries:
+            data = read()
+            digest = content_hash(data)
+            hit = result_cache.get(digest)
+            if hit is not None:
+                cached.append({"file": filename, "cached": True, "parsed_data": hit})
+                continue
+            item = (filename, data)
+            digests[id(item)] = digest
+            yield item
+
+    def generate():
+        try:
+            for item, result in batch.iter_parse(pending()):
+                while cached:
+                    yield json.dumps(cached.pop(0)) + '\n'
+                digest = digests.pop(id(item))
+                if 'parsed_data' in result:
+                    store_result(digest, result['parsed_data'], filename=result['file'])
+                result['cached'] = False
+                yield json.dumps(result) + '\n'
+            while cached:
+                yield json.dumps(cached.pop(0)) + '\n'
+        finally:
+            close_spools()
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """
+    Search parsed candidates. Query options (all optional, combined with AND):
+      q=...                  ranked free text (name, designation, skills, companies, CV text)
+      skill=, company=, language=   exact facet match, repeatable (all must match)
+      location=, designation=       words that must appear in that field
+      min_experience=, max_experience=   total years of experience
+      limit= (default 20, max 200), offset=
+    """
+    try:
+        hits = search_index.search(
+            q=request.args.get('q'),
+            skills=request.args.getlist('skill'),
+            companies=request.args.getlist('company'),
+            languages=request.args.getlist('language'),
+            location=request.args.get('location'),
+            designation=request.args.get('designation'),
+            min_experience=request.args.get('min_experience', type=int),
+            max_experience=request.args.get('max_experience', type=int),
+            limit=request.args.get('limit', 20, type=int),
+            offset=request.args.get('offset', 0, type=int),
+        )
+    except sqlite3.OperationalError as e:
+        return jsonify({"error": f"Invalid search: {str(e)}"}), 400
+    return jsonify({"count": len(hits), "results": hits}), 200
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue a CV for parsing and return its job ID immediately (202)."""
+    if 'file' not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+
+    if not allowed_file(file.filename):
+        return jsonify({"error": "Invalid file format. Allowed: pdf, docx, pptx, txt"}), 400
+
+    filename = secure_filename(file.filename)
+    data = file.read()
+    digest = content_hash(data)
+    cached = result_cache.get(digest)
+    if cached is not None:
+        job_id = job_queue.add_done(filename, cached, digest)
+    else:
+        try:
+            job_id = job_queue.submit(filename, data, digest)
+        except QueueFull as e:
+            resp = jsonify({"error": str(e), "queue_depth": job_queue.depth()})
+            resp.headers['Retry-After'] = '30'
+            return resp, 503
+
+    job = job_queue.get(job_id)
+    job["queue_depth"] = job_queue.depth()
+    return jsonify(job), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job_queue.ensure_started()
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job), 200
+
+@app.route('/api/jobs', methods=['GET'])
+def job_stats():
+    return jsonify(job_queue.stats()), 200
+
 if __name__ == '__main__':
+    # Models load lazily on the first request unless asked to preload
+    if os.environ.get('CV_PARSER_PRELOAD_MODELS'):
+        models.preload()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
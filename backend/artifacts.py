@@ -0,0 +1,295 @@
+# artifacts.py
+"""
+Intermediate artifacts of every parsed document, so that a changed
+heuristic re-runs only the stages it affects instead of pdfplumber, OCR and
+spaCy over the whole corpus.
+
+    stage          artifact                                  version covers
+    pages          text of every page (text layer / OCR)     readers, OCR settings
+    ascii          unidecode transliteration                 pages + unidecode release
+    doc            spaCy Doc, serialised with DocBin         ascii + spaCy model / release
+    edu_entities   education NER output (JSON)               ascii + edu_ner model / backend
+
+Artifacts are keyed by (content hash, stage) in one SQLite file and carry
+the version of the stage that produced them (each version includes the
+versions of the stages it was computed from). A stored artifact is reused
+only while its version is current.
+
+    python artifacts.py rerun                           # re-extract every stored document
+    python artifacts.py rerun --fields past_companies   # only these fields; the rest are kept
+    python artifacts.py rerun --uploads uploads/        # re-read files whose text is stale
+    python artifacts.py stats
+
+`rerun` recomputes the stale stages, runs the extractors on the rest and
+appends the new records to the result store (result_store.py) under the
+current pipeline version. After a regex-only change (bump PIPELINE_VERSION)
+that is the extractors alone.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from importlib import metadata
+from pathlib import Path
+
+import models
+import ocr
+from nlp_model import (
+    EDU_NER_STRIDE, EDU_NER_WINDOW, MAX_PDF_PAGES, MAX_TEXT_CHARS, OCR_MIN_IMAGE_COVERAGE, OCR_MIN_PAGE_CHARS,
+    TEXT_STAGE_VERSION,
+)
+
+ARTIFACTS_DB = os.environ.get("CV_PARSER_ARTIFACTS_DB", "artifacts.sqlite3")
+# Persist artifacts of every parse (web app and batch.py)
+ARTIFACTS_ENABLED = os.environ.get("CV_PARSER_ARTIFACTS", "1").lower() not in ("0", "false", "no")
+STAGES = ("pages", "ascii", "doc", "edu_entities")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    result_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    version TEXT NOT NULL,
+    data BLOB,
+    meta TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (result_id, stage)
+);
+"""
+
+
+def _release(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def stage_versions():
+    """Current version of every stage."""
+    pages = (f"text={TEXT_STAGE_VERSION};ocr={ocr.OCR_DPI},{ocr.OCR_LANG},{ocr.OCR_MAX_PAGES};"
+             f"ocr_pages={OCR_MIN_PAGE_CHARS},{OCR_MIN_IMAGE_COVERAGE};limits={MAX_PDF_PAGES},{MAX_TEXT_CHARS}")
+    ascii_ = f"{pages}|unidecode={_release('unidecode')}"
+    return {
+        "pages": pages,
+        "ascii": ascii_,
+        "doc": f"{ascii_}|spacy={_release('spacy')};{models.SPACY_MODEL};sentences={models.SPACY_SENTENCES}",
+        "edu_entities": f"{ascii_}|edu_ner={models.EDU_NER_MODEL};{models.NER_BACKEND};"
+                        f"window={EDU_NER_WINDOW},{EDU_NER_STRIDE}",
+    }
+
+
+def _covers(stored, wanted):
+    """Doc built with features `stored` has everything `wanted` needs (None = whole pipeline)."""
+    if stored is None:
+        return True
+    return wanted is not None and set(wanted) <= set(stored)
+
+
+def _doc_to_bytes(doc):
+    from spacy.tokens import DocBin
+    return DocBin(docs=[doc]).to_bytes()
+
+
+def _doc_from_bytes(data):
+    from spacy.tokens import DocBin
+    return next(iter(DocBin().from_bytes(data).get_docs(models.get_nlp().vocab)))
+
+
+class ArtifactStore:
+    def __init__(self, db_path=ARTIFACTS_DB):
+        self.db_path = str(db_path)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _stored(self, db, result_id):
+        return {
+            row["stage"]: row
+            for row in db.execute("SELECT * FROM artifacts WHERE result_id = ?", (result_id,))
+        }
+
+    def save(self, result_id, pdoc):
+        """
+        Store the artifacts `pdoc` has (the Doc and education entities only if
+        they were computed), skipping the ones already stored at this version.
+        """
+        versions = stage_versions()
+        artifacts = {}
+        if pdoc.pages is not None:
+            artifacts["pages"] = (json.dumps(pdoc.pages).encode("utf-8"), {"source": pdoc.source})
+        artifacts["ascii"] = (pdoc.text_ascii.encode("utf-8"), None)
+        if pdoc._doc is not None:
+            artifacts["doc"] = (pdoc._doc, {"features": pdoc.spacy_features})
+        if pdoc.edu_entities is not None:
+            artifacts["edu_entities"] = (json.dumps(pdoc.edu_entities).encode("utf-8"), None)
+
+        db = self._connect()
+        try:
+            stored = self._stored(db, result_id)
+            rows = []
+            for stage, (data, meta) in artifacts.items():
+                old = stored.get(stage)
+                if old is not None and old["version"] == versions[stage]:
+                    # A Doc with more components than the stored one replaces it
+                    if stage != "doc" or _covers(json.loads(old["meta"])["features"], meta["features"]):
+                        continue
+                if stage == "doc":
+                    data = _doc_to_bytes(data)
+                rows.append((result_id, stage, versions[stage], data,
+                             json.dumps(meta) if meta is not None else None, time.time()))
+            if rows:
+                db.executemany(
+                    "INSERT OR REPLACE INTO artifacts (result_id, stage, version, data, meta, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows,
+                )
+        finally:
+            db.close()
+
+    def load(self, result_id, features=None):
+        """
+        (ParsedDocument, reused stages) rebuilt from the current artifacts, or
+        (None, []) when the page texts are missing or stale. The Doc is reused
+        only if it was built with every spaCy feature in `features`.
+        """
+        from nlp_model import ParsedDocument
+        versions = stage_versions()
+        with self._connect() as db:
+            stored = {
+                stage: row for stage, row in self._stored(db, result_id).items()
+                if row["version"] == versions[stage]
+            }
+        if "pages" not in stored:
+            return None, []
+        pages = json.loads(stored["pages"]["data"])
+        text_ascii = stored["ascii"]["data"].decode("utf-8") if "ascii" in stored else None
+        pdoc = ParsedDocument("\n".join(pages), source=json.loads(stored["pages"]["meta"])["source"],
+                              pages=pages, text_ascii=text_ascii)
+        reused = ["pages"] + (["ascii"] if text_ascii is not None else [])
+        if "doc" in stored:
+            doc_features = json.loads(stored["doc"]["meta"])["features"]
+            if _covers(doc_features, features):
+                pdoc._doc = _doc_from_bytes(stored["doc"]["data"])
+                pdoc.spacy_features = doc_features
+                reused.append("doc")
+        if "edu_entities" in stored:
+            pdoc.edu_entities = json.loads(stored["edu_entities"]["data"])
+            reused.append("edu_entities")
+        return pdoc, reused
+
+    def source(self, result_id):
+        """File name the document was uploaded as, if known."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT meta FROM artifacts WHERE result_id = ? AND stage = 'pages'", (result_id,)
+            ).fetchone()
+        return json.loads(row["meta"])["source"] if row is not None else None
+
+    def result_ids(self):
+        with self._connect() as db:
+            return [r[0] for r in db.execute("SELECT DISTINCT result_id FROM artifacts ORDER BY result_id")]
+
+    def stats(self):
+        versions = stage_versions()
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT stage, version, COUNT(*) AS n, SUM(LENGTH(data)) AS size FROM artifacts GROUP BY stage, version"
+            ).fetchall()
+        out = {stage: {"current": 0, "stale": 0, "bytes": 0} for stage in STAGES}
+        for r in rows:
+            entry = out.setdefault(r["stage"], {"current": 0, "stale": 0, "bytes": 0})
+            entry["current" if r["version"] == versions.get(r["stage"]) else "stale"] += r["n"]
+            entry["bytes"] += r["size"] or 0
+        return out
+
+
+def _reread(result_id, source, uploads):
+    """ParsedDocument read again from `uploads`/<source>, if that file still has this content hash."""
+    from nlp_model import load_document
+    from result_cache import content_hash
+    path = Path(uploads) / source if uploads and source else None
+    if path is None or not path.is_file():
+        return None
+    data = path.read_bytes()
+    if content_hash(data) != result_id:
+        return None
+    return load_document(data, filename=source)
+
+
+def rerun(store, results, fields=None, uploads=None, limit=None):
+    """
+    Re-extract every stored document (see the module docstring); returns
+    counts of documents re-extracted / skipped and of reused stages.
+    """
+    import extractors
+    from nlp_model import pipeline_version
+    features = extractors.spacy_features(
+        [ex for ex in extractors.REGISTRY.values() if fields is None or ex.field in fields])
+    version = pipeline_version()
+    counts = {"rerun": 0, "missing_text": 0, "failed": 0, "reused": {stage: 0 for stage in STAGES}}
+    for n, result_id in enumerate(store.result_ids()):
+        if limit is not None and n >= limit:
+            break
+        pdoc, reused = store.load(result_id, features)
+        if pdoc is None:
+            pdoc = _reread(result_id, store.source(result_id), uploads)
+            if pdoc is None:
+                counts["missing_text"] += 1
+                continue
+        for stage in reused:
+            counts["reused"][stage] += 1
+        try:
+            prior = results.latest(result_id) if fields is not None else None
+            if fields is not None and prior is not None:
+                fresh = extractors.run(pdoc, fields=fields)
+                parsed_data = extractors.merge(pdoc, {**prior, **fresh})
+            else:
+                parsed_data = extractors.run(pdoc)
+        except Exception as e:
+            print(f"Re-extraction failed for {pdoc.source or result_id}: {e}", file=sys.stderr)
+            counts["failed"] += 1
+            continue
+        results.append(result_id, parsed_data, filename=pdoc.source)
+        store.save(result_id, pdoc)
+        counts["rerun"] += 1
+    results.flush()
+    counts["pipeline_version"] = version
+    return counts
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Persisted pipeline artifacts and incremental re-extraction.")
+    ap.add_argument("--db", default=ARTIFACTS_DB)
+    sub = ap.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("rerun", help="re-extract every stored document from its current artifacts")
+    r.add_argument("--fields", help="comma-separated fields to recompute; the others are kept from the stored result")
+    r.add_argument("--profile", help="a named field selection instead of --fields (e.g. no-summary)")
+    r.add_argument("--uploads", help="directory of original uploads, to re-read documents whose text is stale")
+    r.add_argument("--results-db", help="result store to append to (default: CV_PARSER_RESULTS_DB)")
+    r.add_argument("--limit", type=int)
+    sub.add_parser("stats")
+    args = ap.parse_args(argv)
+
+    store = ArtifactStore(args.db)
+    if args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+        return 0
+
+    import extractors
+    from nlp_model import pipeline_version
+    from result_store import RESULTS_DB, ResultStore
+    fields = extractors.resolve_fields(args.fields, args.profile)
+    results = ResultStore(args.results_db or RESULTS_DB, pipeline_version)
+    counts = rerun(store, results, fields, args.uploads, args.limit)
+    print(json.dumps(counts, indent=2))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
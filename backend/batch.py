@@ -0,0 +1,201 @@
+# batch.py
+"""
+Bulk parsing over a process pool.
+
+    python batch.py uploads/ --out results.jsonl [--workers 8]
+
+Every file goes through the same full parse as /api/parse-cv
+(pipeline.parse_file). Results are yielded / written as each file finishes,
+not in input order. Items are paths, or (filename, bytes) pairs for files
+that only exist in memory (web uploads).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from pathlib import Path
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".pptx", ".txt"}
+BATCH_WORKERS = int(os.environ.get("CV_PARSER_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+# Files handed to a worker at once; their education NER runs as one batch
+BATCH_GROUP_SIZE = int(os.environ.get("CV_PARSER_BATCH_GROUP_SIZE", "4"))
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # The batch pool already uses every core: OCR pages and run extractors
+    # serially per file
+    import extractors
+    import ocr
+    ocr.OCR_WORKERS = 1
+    extractors.EXTRACTOR_WORKERS = 1
+
+
+def get_pool():
+    """Process pool shared by the web app's batch endpoint, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS, initializer=_init_worker)
+        return _pool
+
+
+def replace_pool(pool):
+    """
+    Drop `pool` if it is still the shared one, e.g. after a worker process
+    died (OOM) and broke it: the next get_pool() starts a new pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_one(path):
+    """Worker entry point: never raises, so one bad file cannot stop a batch."""
+    from pipeline import parse_file
+    try:
+        return {"file": Path(path).name, "parsed_data": parse_file(path)}
+    except Exception as e:
+        return {"file": Path(path).name, "error": f"Failed to parse file: {str(e)}"}
+
+
+def _load(item):
+    """(filename, content hash, ParsedDocument) of a path or (filename, bytes) pair."""
+    from nlp_model import load_document
+    from result_cache import content_hash
+    if isinstance(item, tuple):
+        name, data = item
+    else:
+        name, data = Path(item).name, Path(item).read_bytes()
+    return name, content_hash(data), load_document(data, filename=name)
+
+
+def _save_artifacts(pdocs):
+    # Page texts, Docs and NER output for `python artifacts.py rerun`
+    import artifacts
+    if not artifacts.ARTIFACTS_ENABLED:
+        return
+    try:
+        store = artifacts.ArtifactStore()
+        for _, digest, pdoc in pdocs:
+            store.save(digest, pdoc)
+    except Exception as e:
+        logger.warning("Saving artifacts failed: %s", e)
+
+
+def parse_group(items):
+    """
+    Worker entry point for several files (paths or (filename, bytes) pairs):
+    model inference that batches well (education NER) runs once over the
+    whole group. Never raises.
+    """
+    import extractors
+    from nlp_model import prefetch_docs, prefetch_education
+    from pipeline import parse_document
+    pdocs, results = {}, {}
+    for i, item in enumerate(items):
+        try:
+            pdocs[i] = _load(item)
+        except Exception as e:
+            name = item[0] if isinstance(item, tuple) else Path(item).name
+            results[i] = {"file": name, "error": f"Failed to parse file: {str(e)}"}
+    group = [pdoc for _, _, pdoc in pdocs.values()]
+    # Each document falls back to its own spaCy / NER call if these fail
+    try:
+        # One nlp.pipe pass (CV_PARSER_SPACY_BATCH_SIZE / _N_PROCESS) for the group
+        prefetch_docs(group, extractors.spacy_features(extractors.REGISTRY.values()))
+    except Exception:
+        pass
+    try:
+        prefetch_education(group)
+    except Exception:
+        pass
+    for i, (name, _, pdoc) in pdocs.items():
+        try:
+            results[i] = {"file": name, "parsed_data": parse_document(pdoc)}
+        except Exception as e:
+            results[i] = {"file": name, "error": f"Failed to parse file: {str(e)}"}
+    _save_artifacts(pdocs.values())
+    return [results[i] for i in range(len(items))]
+
+
+def iter_parse(items, pool=None, group_size=BATCH_GROUP_SIZE, max_pending=None):
+    """
+    Yield (item, result) for `items` as each group of files completes.
+    `items` may be a generator: it is consumed as results come back, with at
+    most `max_pending` groups (default: two per worker) submitted at a time,
+    so an upload's files are not all held in memory at once.
+    """
+    pool = pool or get_pool()
+    max_pending = max_pending or 2 * BATCH_WORKERS
+    items = iter(items)
+    futures = {}
+
+    def submit_groups():
+        while len(futures) < max_pending:
+            group = list(islice(items, max(1, group_size)))
+            if not group:
+                return
+            futures[pool.submit(parse_group, [i if isinstance(i, tuple) else str(i) for i in group])] = group
+
+    submit_groups()
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for fut in done:
+            try:
+                results = fut.result()
+            except BrokenProcessPool:
+                # Later batches get a new pool; this one has lost its files
+                replace_pool(pool)
+                raise
+            for item, result in zip(futures.pop(fut), results):
+                yield item, result
+        submit_groups()
+
+
+def find_cvs(directory):
+    return sorted(
+        p for p in Path(directory).rglob("*")
+        if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parse every CV in a directory.")
+    ap.add_argument("directory")
+    ap.add_argument("--out", default="-", help="JSON Lines output file (default: stdout)")
+    ap.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    ap.add_argument("--group-size", type=int, default=BATCH_GROUP_SIZE,
+                    help="files per worker task; NER is batched across them")
+    args = ap.parse_args(argv)
+
+    paths = find_cvs(args.directory)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+            for i, (_, result) in enumerate(iter_parse(paths, pool, args.group_size), 1):
+                failed += "error" in result
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                print(f"[{i}/{len(paths)}] {result['file']}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Parsed {len(paths) - failed}/{len(paths)} files", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+# benchmark.py
+"""
+Benchmark + output regression check over a corpus of CVs.
+
+    python benchmark.py run [uploads/] [--golden parsed_data/] [-o report.json]
+    python benchmark.py compare old_report.json new_report.json
+    python benchmark.py run --update-golden     # accept current outputs
+    python benchmark.py ner [uploads/] --backends torch,onnx   # NER runtimes side by side
+
+`run` parses every CV stage by stage (text extraction, the shared inputs
+such as the spaCy Doc, then each registered extractor) and records wall
+time, CPU time and peak RSS per stage plus the model load times. Each field
+is compared with the stored output in the golden directory
+(parsed_data/<name>.json). The JSON report is meant to be kept per commit
+and diffed with `compare`.
+
+`ner` runs one token-classification model (edu_ner / resume_ner) on every
+backend given, over the same text windows the pipeline feeds it, and
+reports load time, resident memory added, latency per CV and how well each
+backend's entities agree with the first one's. Memory figures are cleanest
+with one backend per invocation.
+"""
+import argparse
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import extractors
+import models
+from batch import find_cvs
+from nlp_model import (
+    EDU_NER_BATCH_SIZE, ParsedDocument, _education_text, _token_windows, load_text, pipeline_version,
+)
+
+# Report names of the shared inputs (as in older reports / the metrics)
+INPUT_STAGES = {"doc": "spacy_doc", "edu_entities": "edu_ner"}
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def current_rss_kb() -> int:
+    # Resident set size right now (Linux); the peak elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return peak_rss_kb()
+
+
+def timed(fn, *args):
+    wall, cpu = time.perf_counter(), time.process_time()
+    value = fn(*args)
+    return value, {
+        "wall_s": round(time.perf_counter() - wall, 6),
+        "cpu_s": round(time.process_time() - cpu, 6),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def similarity(a, b) -> float:
+    """1.0 for equal values; otherwise a rough 0..1 closeness score."""
+    if a == b:
+        return 1.0
+    if isinstance(a, list) and isinstance(b, list):
+        sa = {json.dumps(x, sort_keys=True) for x in a}
+        sb = {json.dumps(x, sort_keys=True) for x in b}
+        return len(sa & sb) / len(sa | sb) if sa | sb else 1.0
+    if a is None or b is None:
+        return 0.0
+    return SequenceMatcher(None, json.dumps(a, sort_keys=True), json.dumps(b, sort_keys=True)).ratio()
+
+
+def bench_file(path: Path, golden_dir: Path):
+    raw_text, load_stats = timed(load_text, path)
+    pdoc = ParsedDocument(raw_text, source=path.name)
+    stages = {"load_text": load_stats}
+    output = {"error": "File is empty or unreadable"} if pdoc.is_empty else {}
+    # Same extractors as the pipeline, one at a time so each is timed alone
+    todo = extractors.selected(pdoc)
+    inputs = extractors.base_inputs(pdoc)
+    for name in sorted({n for ex in todo for n in ex.needs if n not in inputs}):
+        inputs[name], stages[INPUT_STAGES.get(name, name)] = timed(extractors.PROVIDERS[name], pdoc, todo)
+    for ex in todo:
+        output[ex.field], stages[ex.field] = timed(ex, inputs)
+
+    record = {
+        "file": path.name,
+        "chars": len(raw_text),
+        "stages": stages,
+        "wall_s": round(sum(s["wall_s"] for s in stages.values()), 6),
+        "cpu_s": round(sum(s["cpu_s"] for s in stages.values()), 6),
+    }
+    golden_path = golden_dir / f"{path.stem}.json"
+    if golden_path.exists():
+        golden = json.loads(golden_path.read_text(encoding="utf-8"))
+        record["fields"] = {
+            f: round(similarity(output.get(f), golden.get(f)), 4)
+            for f in sorted(set(output) | set(golden))
+        }
+    return record, output
+
+
+def summarise(files):
+    stage_names = sorted({s for f in files for s in f["stages"]})
+    stages = {}
+    for name in stage_names:
+        walls = sorted(f["stages"][name]["wall_s"] for f in files if name in f["stages"])
+        stages[name] = {
+            "n": len(walls),
+            "total_s": round(sum(walls), 6),
+            "mean_s": round(statistics.mean(walls), 6),
+            "p50_s": round(walls[len(walls) // 2], 6),
+            "p95_s": round(walls[min(len(walls) - 1, int(len(walls) * 0.95))], 6),
+        }
+    fields = {}
+    for f in files:
+        for field, score in f.get("fields", {}).items():
+            fields.setdefault(field, []).append(score)
+    golden = {
+        field: {"exact": sum(s == 1.0 for s in scores) / len(scores), "mean_similarity": round(statistics.mean(scores), 4)}
+        for field, scores in sorted(fields.items())
+    }
+    return {"stages": stages, "golden": golden}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    corpus, golden_dir = Path(args.corpus), Path(args.golden)
+    _, preload_stats = timed(models.preload, args.models.split(",") if args.models else None)
+    files = []
+    for path in find_cvs(corpus):
+        record, output = bench_file(path, golden_dir)
+        files.append(record)
+        print(f"{path.name}: {record['wall_s']:.2f}s", file=sys.stderr)
+        if args.update_golden:
+            (golden_dir / f"{path.stem}.json").write_text(json.dumps(output, indent=4), encoding="utf-8")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "pipeline_version": pipeline_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "corpus": str(corpus),
+        },
+        "models": {"preload": preload_stats, "load_s": models.load_times()},
+        "peak_rss_kb": peak_rss_kb(),
+        "summary": summarise(files) if files else {},
+        "files": files,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        Path(args.out).write_text(text, encoding="utf-8")
+    return 0
+
+
+def compare(args):
+    old = json.loads(Path(args.old).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    regressions = 0
+
+    print(f"{'stage':<24}{'old mean s':>12}{'new mean s':>12}{'change':>10}")
+    old_stages, new_stages = old["summary"].get("stages", {}), new["summary"].get("stages", {})
+    for name in sorted(set(old_stages) | set(new_stages)):
+        a = old_stages.get(name, {}).get("mean_s")
+        b = new_stages.get(name, {}).get("mean_s")
+        change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else "n/a"
+        if a and b is not None and (b - a) / a > args.time_tolerance:
+            regressions += 1
+            change += " !"
+        print(f"{name:<24}{a if a is not None else '-':>12}{b if b is not None else '-':>12}{change:>10}")
+
+    print(f"\n{'field':<24}{'old exact':>12}{'new exact':>12}")
+    old_golden, new_golden = old["summary"].get("golden", {}), new["summary"].get("golden", {})
+    for field in sorted(set(old_golden) | set(new_golden)):
+        a = old_golden.get(field, {}).get("exact")
+        b = new_golden.get(field, {}).get("exact")
+        flag = " !" if a is not None and b is not None and b < a else ""
+        regressions += bool(flag)
+        print(f"{field:<24}{a if a is not None else '-':>12}{b if b is not None else '-':>12}{flag}")
+
+    print(f"\npeak RSS: {old.get('peak_rss_kb')} KiB -> {new.get('peak_rss_kb')} KiB")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+def _entity_set(entities):
+    return {(e["entity_group"], e["word"].strip().lower()) for e in entities}
+
+
+def ner(args):
+    model_id = {"edu_ner": models.EDU_NER_MODEL, "resume_ner": models.RESUME_NER_MODEL}[args.model]
+    backends = args.backends.split(",")
+    texts = []
+    for path in find_cvs(args.corpus):
+        text = ParsedDocument(load_text(path)).text_ascii
+        texts.append((path.name, _education_text(text) if args.model == "edu_ner" else text))
+
+    report = {
+        "meta": {"commit": git_commit(), "model": model_id, "platform": platform.platform(), "timestamp": time.time()},
+        "backends": {},
+    }
+    reference = None
+    for backend in backends:
+        before = current_rss_kb()
+        pipe, load_stats = timed(models.load_ner, model_id, backend)
+        pipe("John Smith studied at Stanford University.")  # warm-up
+        if reference is None:
+            # Same windows for every backend (the tokenizers are identical)
+            chunks = {name: _token_windows(text, pipe.tokenizer) for name, text in texts}
+        outputs, walls = {}, []
+        for name, pieces in chunks.items():
+            if not pieces:
+                outputs[name] = set()
+                continue
+            result, stats = timed(lambda: pipe(pieces, batch_size=EDU_NER_BATCH_SIZE))
+            if len(pieces) == 1 and result and isinstance(result[0], dict):
+                result = [result]
+            outputs[name] = _entity_set(e for ents in result for e in ents)
+            walls.append(stats["wall_s"])
+        walls.sort()
+        entry = {
+            "load_s": load_stats["wall_s"],
+            "rss_added_kb": current_rss_kb() - before,
+            "files": len(walls),
+            "mean_s": round(statistics.mean(walls), 6) if walls else None,
+            "p50_s": round(walls[len(walls) // 2], 6) if walls else None,
+            "p95_s": round(walls[min(len(walls) - 1, int(len(walls) * 0.95))], 6) if walls else None,
+        }
+        if reference is None:
+            reference = outputs
+        else:
+            tp = sum(len(outputs[n] & reference[n]) for n in outputs)
+            found = sum(len(outputs[n]) for n in outputs)
+            expected = sum(len(reference[n]) for n in reference)
+            precision = tp / found if found else 1.0
+            recall = tp / expected if expected else 1.0
+            entry["vs_" + backends[0]] = {
+                "precision": round(precision, 4),
+                "recall": round(recall, 4),
+                "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+                "identical_files": sum(outputs[n] == reference[n] for n in outputs),
+            }
+        report["backends"][backend] = entry
+        del pipe
+
+    print(f"{'backend':<10}{'load s':>9}{'RSS MiB':>9}{'mean s':>10}{'p95 s':>10}{'F1':>8}", file=sys.stderr)
+    for backend, e in report["backends"].items():
+        f1 = e.get("vs_" + backends[0], {}).get("f1", "-")
+        print(f"{backend:<10}{e['load_s']:>9.2f}{e['rss_added_kb'] / 1024:>9.0f}{e['mean_s'] or 0:>10.4f}"
+              f"{e['p95_s'] or 0:>10.4f}{f1:>8}", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        Path(args.out).write_text(text, encoding="utf-8")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the CV parser on a corpus and check output drift.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run")
+    r.add_argument("corpus", nargs="?", default="uploads")
+    r.add_argument("--golden", default="parsed_data", help="directory of expected <name>.json outputs")
+    r.add_argument("-o", "--out", default="-", help="report file (default: stdout)")
+    r.add_argument("--models", help="comma-separated models to preload (default: models.DEFAULT_PRELOAD)")
+    r.add_argument("--update-golden", action="store_true", help="overwrite the golden outputs with this run")
+
+    c = sub.add_parser("compare")
+    c.add_argument("old")
+    c.add_argument("new")
+    c.add_argument("--time-tolerance", type=float, default=0.10, help="flag stages slower by more than this fraction")
+    c.add_argument("--fail-on-regression", action="store_true")
+
+    n = sub.add_parser("ner")
+    n.add_argument("corpus", nargs="?", default="uploads")
+    n.add_argument("--model", choices=["edu_ner", "resume_ner"], default="edu_ner")
+    n.add_argument("--backends", default="torch,onnx", help="comma-separated; the first is the reference")
+    n.add_argument("-o", "--out", default="-", help="report file (default: stdout)")
+
+    args = ap.parse_args(argv)
+    return {"run": run, "compare": compare, "ner": ner}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 # certifications_extractor.py
 import re
 
+import metrics
+
+@metrics.timed("extract_certifications")
 def extract_certifications(text: str):
     pattern = r"\b(Diploma|Certification|Certified|Course|Training|PGDAC|Certificate)\b.*"
     matches = re.findall(pattern, text, re.IGNORECASE)
@@ -1,9 +1,11 @@
 # dob_location_language_extractor.py
 import re
-import spacy
 
-nlp = spacy.load("en_core_web_md")
+import metrics
 
+from models import spacy_doc
+
+@metrics.timed("extract_dob")
 def extract_dob(text: str):
     # Common DOB patterns
     dob_patterns = [
@@ -17,8 +19,11 @@ def extract_dob(text: str):
     return None
 
 # ...existing code...
-def extract_location(text: str):
-    doc = nlp(text)
+@metrics.timed("extract_location")
+def extract_location(text: str, doc=None):
+    # `doc` is the shared Doc of the CV when called from the pipeline
+    if doc is None:
+        doc = spacy_doc(text, ["ents"])
     # Try to find explicit "Location:" or "Address:" lines first
     explicit = []
     for line in text.splitlines():
@@ -40,6 +45,7 @@ def extract_location(text: str):
     return filtered[0] if filtered else None
 # ...existing code...
 
+@metrics.timed("extract_languages")
 def extract_languages(text: str):
     langs = re.findall(r"\b(English|Hindi|Marathi|French|German|Spanish|Chinese|Japanese)\b", text, re.IGNORECASE)
     return list(set(langs)) if langs else None
@@ -0,0 +1,475 @@
+# extractors.py
+"""
+Registry of field extractors and a scheduler that runs them concurrently.
+
+Every output field is produced by one registered extractor, which declares
+the document inputs it reads:
+
+    raw_text, text_ascii, lines   ready as soon as the text is loaded
+    doc                           the shared spaCy Doc
+    edu_entities                  edu_ner output for the education section
+    summarizer                    request option (summary backend name)
+
+Extractors reading the Doc also declare which spaCy features they use
+(`spacy`, keys of models.SPACY_FEATURES): the Doc is built with only the
+components the selected extractors need, e.g. NER + senter instead of the
+whole tagger / parser / lemmatizer pipeline.
+
+`doc` and `edu_entities` are expensive, so they are computed as tasks of
+their own. Extractors that only need the text start straight away (and
+overlap with the spaCy parse and the NER call); the others start as soon as
+their inputs are ready. A request then takes about as long as its slowest
+chain (e.g. Doc -> summary) instead of the sum of all extractors.
+
+Tasks run on a thread pool: the documents and Docs are shared, not copied,
+and the model calls spend most of their time outside the GIL.
+
+Callers may ask for a subset of the fields (a list or a PROFILES name).
+Only those extractors run, so inputs (and the models behind them) that no
+requested field needs are never computed or loaded.
+
+Every extractor and input has a time budget (EXTRACTOR_TIMEOUT, per-name
+overrides in CV_PARSER_EXTRACTOR_TIMEOUTS, e.g. "summary=60,doc=20"). A
+field whose extractor fails or overruns is None, with a reason code in the
+record's `field_errors`:
+
+    error / timeout                 the extractor itself
+    <input>_error / <input>_timeout an input it needs, e.g. doc_timeout
+
+A budget counts from the moment the task is queued, so time spent waiting
+for a busy pool counts too. All extractors of one document together get
+PARSE_TIMEOUT; whatever has not finished by then times out as well.
+
+On the thread pool an overrun task is abandoned (its thread finishes in the
+background). Once abandoned tasks hold half the shared pool's threads, the
+pool is replaced so that new requests get a full set of workers. Run serially
+in a process's main thread (batch workers), an overrun task is interrupted
+with SIGALRM. SIGALRM cannot reach other threads, so EXTRACTOR_WORKERS=1 in
+any other thread (e.g. a Flask request thread) runs the tasks on a
+single-thread pool of the call's own.
+"""
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import copy_context
+
+import metrics
+
+from nlp_model import (
+    education_entities, extract_designation, extract_education_and_gpa, extract_emails, extract_name,
+    extract_nationality, extract_past_companies, extract_phone_numbers, extract_projects, extract_skills,
+)
+from certificate_extracter import extract_certifications
+from dob_location_language_extractor import extract_dob, extract_location, extract_languages
+from linkedin_website_extractor import extract_linkedin, extract_websites
+from misc_extractor import extract_is_resume_probability, extract_redacted_text
+from objective_proffession_summary_extractor import extract_objective, extract_profession, extract_summary
+from publications_reference_extractor import extract_publications, extract_referees
+from work_experience import extract_total_experience, extract_work_experience
+
+# Threads per process for extractor tasks; 1 runs everything in the calling thread (but see below)
+EXTRACTOR_WORKERS = int(os.environ.get("CV_PARSER_EXTRACTOR_WORKERS", "4"))
+# Seconds an extractor / input may take (0 disables the limit)
+EXTRACTOR_TIMEOUT = float(os.environ.get("CV_PARSER_EXTRACTOR_TIMEOUT", "30"))
+EXTRACTOR_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (
+        item.partition("=") for item in os.environ.get("CV_PARSER_EXTRACTOR_TIMEOUTS", "").split(",") if "=" in item
+    )
+}
+
+
+# Seconds all extractors of one document may take together (0 disables the limit)
+PARSE_TIMEOUT = float(os.environ.get("CV_PARSER_PARSE_TIMEOUT", "120"))
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractorTimeout(Exception):
+    pass
+
+
+def time_budget(name):
+    """Seconds extractor / input `name` may take; None for no limit."""
+    return EXTRACTOR_TIMEOUTS.get(name, EXTRACTOR_TIMEOUT) or None
+
+
+class Extractor:
+    def __init__(self, field, fn, needs, requires_text, spacy=()):
+        self.field = field
+        self.fn = fn
+        self.needs = tuple(needs)
+        self.spacy = tuple(spacy)
+        # Skipped (with the "File is empty or unreadable" error) when the document has no text
+        self.requires_text = requires_text
+
+    @property
+    def heavy(self):
+        """Needs the spaCy Doc or a model (an input computed by PROVIDERS)."""
+        return any(name in PROVIDERS for name in self.needs)
+
+    def __call__(self, inputs):
+        return self.fn(**{name: inputs[name] for name in self.needs})
+
+
+# field -> Extractor, in output order
+REGISTRY = {}
+
+
+def register(field, needs, requires_text=False, spacy=()):
+    """Decorator registering `fn(**needs)` as the extractor of `field`."""
+    def wrap(fn):
+        REGISTRY[field] = Extractor(field, fn, needs, requires_text, spacy)
+        return fn
+    return wrap
+
+
+def spacy_features(todo):
+    """spaCy features the Doc needs for the extractors in `todo`."""
+    return sorted({f for ex in todo if "doc" in ex.needs for f in ex.spacy})
+
+
+def _doc(pdoc, todo):
+    pdoc.use_spacy_features(spacy_features(todo))
+    return pdoc.doc
+
+
+def _edu_entities(pdoc, todo):
+    # Precomputed for the whole group in batch mode (prefetch_education)
+    if pdoc.edu_entities is None:
+        pdoc.edu_entities = education_entities([pdoc.text_ascii])[0]
+    return pdoc.edu_entities
+
+
+# Inputs computed on demand, as scheduler tasks of their own: fn(pdoc, extractors to run)
+PROVIDERS = {
+    "doc": _doc,
+    "edu_entities": _edu_entities,
+}
+
+
+# --- Base fields (nlp_model) ---
+register("name", ["doc", "text_ascii"], requires_text=True, spacy=["ents"])(
+    lambda doc, text_ascii: extract_name(doc, text_ascii))
+register("phone_number", ["text_ascii"], requires_text=True)(
+    lambda text_ascii: "; ".join(extract_phone_numbers(text_ascii)))
+register("email", ["text_ascii"], requires_text=True)(
+    lambda text_ascii: extract_emails(text_ascii))
+register("designation", ["text_ascii"], requires_text=True)(
+    lambda text_ascii: extract_designation(text_ascii))
+register("skills", ["text_ascii", "doc"], requires_text=True, spacy=["tokens"])(
+    lambda text_ascii, doc: "; ".join(extract_skills(text_ascii, doc)))
+register("nationality", ["text_ascii"], requires_text=True)(
+    lambda text_ascii: extract_nationality(None, text_ascii))
+register("education", ["text_ascii", "doc", "edu_entities"], requires_text=True, spacy=["ents"])(
+    lambda text_ascii, doc, edu_entities: extract_education_and_gpa(text_ascii, doc, edu_entities))
+register("projects", ["text_ascii"], requires_text=True)(
+    lambda text_ascii: extract_projects(text_ascii))
+register("past_companies", ["text_ascii", "doc"], requires_text=True, spacy=["ents"])(
+    lambda text_ascii, doc: extract_past_companies(text_ascii, doc))
+
+# --- Auxiliary extractors ---
+register("certifications", ["raw_text"])(lambda raw_text: extract_certifications(raw_text))
+register("date_of_birth", ["raw_text"])(lambda raw_text: extract_dob(raw_text))
+register("location", ["raw_text", "doc"], spacy=["ents"])(lambda raw_text, doc: extract_location(raw_text, doc))
+register("languages", ["raw_text"])(lambda raw_text: extract_languages(raw_text))
+register("linkedin", ["raw_text"])(lambda raw_text: extract_linkedin(raw_text))
+register("websites", ["raw_text"])(lambda raw_text: extract_websites(raw_text))
+register("is_resume_probability", ["raw_text"])(lambda raw_text: extract_is_resume_probability(raw_text))
+register("redacted_text", ["raw_text"])(lambda raw_text: extract_redacted_text(raw_text))
+register("objective", ["raw_text"])(lambda raw_text: extract_objective(raw_text))
+register("profession", ["raw_text"])(lambda raw_text: extract_profession(raw_text))
+register("summary", ["raw_text", "doc", "summarizer"], spacy=["sents"])(
+    lambda raw_text, doc, summarizer: extract_summary(raw_text, doc, summarizer))
+register("publications", ["raw_text"])(lambda raw_text: extract_publications(raw_text))
+register("referees", ["raw_text"])(lambda raw_text: extract_referees(raw_text))
+register("total_experience", ["raw_text"])(lambda raw_text: extract_total_experience(raw_text))
+register("work_experience", ["raw_text", "doc"], spacy=["sents"])(lambda raw_text, doc: extract_work_experience(raw_text, doc))
+
+
+# Named field selections; None means every registered field
+PROFILES = {
+    "full": None,
+    "no-summary": [f for f in REGISTRY if f != "summary"],
+    # Enough to recognise an applicant again: regexes + the name (spaCy only)
+    "contact": ["name", "email", "phone_number", "linkedin"],
+}
+DEFAULT_PROFILE = "full"
+
+
+def resolve_fields(fields=None, profile=None):
+    """
+    Field names (registry order) for a list / comma-separated string of
+    fields or a profile name; None when everything is wanted. Raises
+    ValueError for unknown names.
+    """
+    if fields:
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(fields) - set(REGISTRY))
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(REGISTRY)}")
+        wanted = set(fields)
+        return None if wanted == set(REGISTRY) else [f for f in REGISTRY if f in wanted]
+    if profile:
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile: {profile}. Available: {', '.join(PROFILES)}")
+        return PROFILES[profile]
+    return None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+# Tasks of the shared pool still running after their budget ran out
+_abandoned = set()
+
+
+def get_pool():
+    """Thread pool shared by all requests of this process, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None and EXTRACTOR_WORKERS > 1:
+            _pool = ThreadPoolExecutor(max_workers=EXTRACTOR_WORKERS, thread_name_prefix="extractor")
+        return _pool
+
+
+def _abandon(pool, fut):
+    """
+    Give up on an overrun task. A running thread cannot be stopped: once
+    abandoned tasks hold half the shared pool's threads, the next
+    get_pool() creates a new pool (the old one goes away when the requests
+    still using it are done and its threads finish).
+    """
+    global _pool
+    if fut.cancel():
+        return
+    metrics.inc("extractor_tasks_abandoned_total")
+    with _pool_lock:
+        if pool is not _pool:
+            return
+        _abandoned.add(fut)
+        fut.add_done_callback(_abandoned.discard)
+        if len(_abandoned) >= max(1, EXTRACTOR_WORKERS // 2):
+            logger.warning("Replacing the extractor pool: %d of its %d threads are stuck in overrun tasks",
+                           len(_abandoned), EXTRACTOR_WORKERS)
+            metrics.inc("extractor_pools_replaced_total")
+            _pool = None
+            _abandoned.clear()
+
+
+def base_inputs(pdoc, summarizer=None):
+    """The inputs every document has without further work."""
+    return {
+        "raw_text": pdoc.raw_text,
+        "text_ascii": pdoc.text_ascii,
+        "lines": pdoc.lines,
+        "summarizer": summarizer,
+    }
+
+
+def selected(pdoc, fields=None):
+    """Extractors to run for `pdoc` (restricted to `fields`), in output order."""
+    return [
+        ex for ex in REGISTRY.values()
+        if (fields is None or ex.field in fields) and not (ex.requires_text and pdoc.is_empty)
+    ]
+
+
+EMPTY_ERROR = "File is empty or unreadable"
+
+
+def _can_interrupt():
+    """SIGALRM can cut a task short: only in the main thread, and not on Windows."""
+    return threading.current_thread() is threading.main_thread() and hasattr(signal, "setitimer")
+
+
+def _limit(name, deadline):
+    """Seconds `name` may take: its own budget, cut to what is left before `deadline`."""
+    seconds = time_budget(name)
+    if deadline is not None:
+        left = deadline - time.monotonic()
+        seconds = left if seconds is None else min(seconds, left)
+    return seconds
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Raise ExtractorTimeout after `seconds` (at once if none are left); only possible in the main thread."""
+    if seconds is not None and seconds <= 0:
+        raise ExtractorTimeout()
+    if not seconds or not _can_interrupt():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise ExtractorTimeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _failed(name, exc):
+    if isinstance(exc, ExtractorTimeout):
+        return "timeout"
+    logger.warning("Extractor %s failed: %r", name, exc)
+    return "error"
+
+
+def _run_serial(pdoc, todo, inputs, errors, deadline=None):
+    failed_inputs = {}
+    for ex in todo:
+        for name in ex.needs:
+            if name not in inputs and name not in failed_inputs:
+                try:
+                    with _time_limit(_limit(name, deadline)):
+                        inputs[name] = PROVIDERS[name](pdoc, todo)
+                except Exception as e:
+                    failed_inputs[name] = f"{name}_{_failed(name, e)}"
+        failed = next((failed_inputs[n] for n in ex.needs if n in failed_inputs), None)
+        if failed is None:
+            try:
+                with _time_limit(_limit(ex.field, deadline)):
+                    value = ex(inputs)
+            except Exception as e:
+                failed = _failed(ex.field, e)
+        if failed is not None:
+            errors[ex.field] = failed
+            value = None
+        yield ex.field, value
+
+
+def _run_concurrent(pdoc, todo, inputs, pool, errors, deadline=None):
+    # Task deadline: submission time + its budget, or the document's deadline if sooner
+    deadlines = {}
+
+    def submit(key, fn, *args):
+        budget = time_budget(key[1])
+        due = time.monotonic() + budget if budget else None
+        if deadline is not None:
+            due = deadline if due is None else min(due, deadline)
+        # Each task runs in a copy of the caller's context, so stage timings
+        # still reach the request's Server-Timing collector
+        fut = pool.submit(copy_context().run, fn, *args)
+        deadlines[fut] = due
+        return fut
+
+    tasks = {}
+    for name in {n for ex in todo for n in ex.needs if n not in inputs}:
+        key = ("input", name)
+        tasks[submit(key, PROVIDERS[name], pdoc, todo)] = key
+    waiting = list(todo)
+    failed_inputs = {}
+
+    def settle():
+        """Start the extractors whose inputs are ready; yield those that can never start."""
+        for ex in list(waiting):
+            failed = next((failed_inputs[n] for n in ex.needs if n in failed_inputs), None)
+            ready = failed is None and all(n in inputs for n in ex.needs)
+            if ready and deadline is not None and time.monotonic() >= deadline:
+                failed = "timeout"
+            if failed is not None:
+                waiting.remove(ex)
+                errors[ex.field] = failed
+                yield ex.field, None
+            elif ready:
+                waiting.remove(ex)
+                key = ("field", ex.field)
+                tasks[submit(key, ex, dict(inputs))] = key
+
+    def finish(key, reason=None, value=None):
+        kind, name = key
+        if kind == "input":
+            if reason is None:
+                inputs[name] = value
+            else:
+                failed_inputs[name] = f"{name}_{reason}"
+            return settle()
+        if reason is not None:
+            errors[name] = reason
+        return [(name, value)]
+
+    yield from settle()
+    try:
+        while tasks:
+            due = min((deadlines[fut] for fut in tasks if deadlines[fut] is not None), default=None)
+            timeout = None if due is None else max(0.0, due - time.monotonic())
+            done, _ = wait(tasks, timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = tasks.pop(fut)
+                del deadlines[fut]
+                try:
+                    value = fut.result()
+                except Exception as e:
+                    yield from finish(key, _failed(key[1], e))
+                else:
+                    yield from finish(key, value=value)
+            now = time.monotonic()
+            for fut in list(tasks):
+                if not fut.done() and deadlines[fut] is not None and now >= deadlines[fut]:
+                    # Overrun: its result is ignored
+                    _abandon(pool, fut)
+                    del deadlines[fut]
+                    yield from finish(tasks.pop(fut), "timeout")
+    finally:
+        # The consumer stopped: do not start work nobody will read
+        for fut in tasks:
+            fut.cancel()
+
+
+def iter_run(pdoc, summarizer=None, pool=None, fields=None, errors=None):
+    """
+    Yield (field, value) as each extractor finishes (completion order; an
+    empty document first yields ("error", EMPTY_ERROR)). A failed field
+    yields None and its reason code goes into `errors` ({field: reason})
+    first. Same arguments as run().
+    """
+    deadline = time.monotonic() + PARSE_TIMEOUT if PARSE_TIMEOUT else None
+    todo = selected(pdoc, fields)
+    inputs = base_inputs(pdoc, summarizer)
+    pool = pool or get_pool()
+    errors = {} if errors is None else errors
+    if pdoc.is_empty:
+        yield "error", EMPTY_ERROR
+    if pool is None and not _can_interrupt() and (deadline is not None or EXTRACTOR_TIMEOUT or EXTRACTOR_TIMEOUTS):
+        # Budgets cannot be enforced in this thread: run on a pool of this call's own
+        own_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extractor")
+        try:
+            yield from _run_concurrent(pdoc, todo, inputs, own_pool, errors, deadline)
+        finally:
+            own_pool.shutdown(wait=False)
+    elif pool is None:
+        yield from _run_serial(pdoc, todo, inputs, errors, deadline)
+    else:
+        yield from _run_concurrent(pdoc, todo, inputs, pool, errors, deadline)
+
+
+def merge(pdoc, results, fields=None, errors=None):
+    """
+    `results` ({field: value}) as the record run() returns: registry order,
+    then `field_errors` if any field failed.
+    """
+    out = {"error": results["error"]} if "error" in results else {}
+    out.update((ex.field, results[ex.field]) for ex in selected(pdoc, fields))
+    if errors:
+        out["field_errors"] = {f: errors[f] for f in out if f in errors}
+    return out
+
+
+def run(pdoc, summarizer=None, pool=None, fields=None):
+    """
+    The registered fields of `pdoc` (all, or those in `fields`, see
+    resolve_fields), in registry order. `pool` defaults to the shared
+    extractor pool (None when EXTRACTOR_WORKERS is 1).
+    """
+    errors = {}
+    results = dict(iter_run(pdoc, summarizer, pool, fields, errors))
+    return merge(pdoc, results, fields, errors)
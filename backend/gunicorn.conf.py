@@ -0,0 +1,16 @@
+# gunicorn.conf.py
+# Usage: gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+
+# Import the app in the master and load the models there once, so every
+# forked worker shares them copy-on-write instead of loading its own copy.
+preload_app = True
+
+
+def when_ready(server):
+    import models
+    models.preload()
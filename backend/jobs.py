@@ -0,0 +1,228 @@
+# jobs.py
+"""
+Asynchronous parse jobs backed by a local SQLite queue.
+
+An upload is spooled to disk and recorded as a 'queued' job; a bounded set
+of worker threads claims jobs one at a time and runs the parse on the batch
+process pool, so no web thread waits on OCR or the transformer models.
+The queue lives in SQLite, so several gunicorn workers can share it and
+queued jobs survive a restart.
+
+Job states: queued -> running -> done | failed
+"""
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import batch
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    path TEXT,
+    digest TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, db_path, spool_dir, workers=2, max_depth=1000, on_done=None):
+        self.db_path = str(db_path)
+        self.spool_dir = Path(spool_dir)
+        self.workers = workers
+        self.max_depth = max_depth
+        # on_done(digest, parsed_data) runs after every successful job
+        self.on_done = on_done
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    # --- Producer side ---
+    def submit(self, filename, data, digest=None):
+        """Spool `data` and enqueue it. Raises QueueFull past max_depth."""
+        self.ensure_started()
+        if self.depth() >= self.max_depth:
+            raise QueueFull(f"Queue is full ({self.max_depth} jobs waiting)")
+        job_id = uuid.uuid4().hex
+        path = self.spool_dir / job_id / filename
+        path.parent.mkdir(parents=True)
+        path.write_bytes(data)
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, filename, path, digest, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, filename, str(path), digest, time.time()),
+            )
+        self._wakeup.set()
+        return job_id
+
+    def add_done(self, filename, parsed_data, digest=None):
+        """Record a job that is already complete (e.g. served from the cache)."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, filename, digest, status, result, created_at, started_at, finished_at) "
+                "VALUES (?, ?, ?, 'done', ?, ?, ?, ?)",
+                (job_id, filename, digest, json.dumps(parsed_data), now, now, now),
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = {
+                "job_id": row["id"],
+                "filename": row["filename"],
+                "status": row["status"],
+                "created_at": row["created_at"],
+                "started_at": row["started_at"],
+                "finished_at": row["finished_at"],
+            }
+            if row["status"] == "queued":
+                job["position"] = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at <= ?",
+                    (row["created_at"],),
+                ).fetchone()[0]
+        if row["result"] is not None:
+            job["parsed_data"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def depth(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def stats(self):
+        with self._connect() as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "queue_depth": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "max_depth": self.max_depth,
+            "workers": self.workers,
+        }
+
+    # --- Consumer side ---
+    def ensure_started(self):
+        """Start the worker threads once per process (safe after a fork)."""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.requeue_stale()
+            for i in range(self.workers):
+                threading.Thread(target=self._work, name=f"cv-job-worker-{i}", daemon=True).start()
+
+    def requeue_stale(self, max_age=3600):
+        """Put jobs left 'running' by a crashed process back in the queue."""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running' AND started_at < ?",
+                (time.time() - max_age,),
+            )
+
+    def _claim(self, db):
+        # Atomic across threads and processes: only one UPDATE can flip a given row
+        while True:
+            row = db.execute(
+                "SELECT id, path, digest FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            cur = db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), row["id"]),
+            )
+            if cur.rowcount == 1:
+                return row
+
+    def _work(self):
+        db = self._connect()
+        while True:
+            try:
+                job = self._claim(db)
+            except sqlite3.Error as e:
+                logger.warning("Claiming a job failed: %s", e)
+                job = None
+            if job is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self._run(db, job)
+
+    def _run(self, db, job):
+        """Parse one claimed job and record the outcome; never raises."""
+        try:
+            pool = batch.get_pool()
+            try:
+                result = pool.submit(batch.parse_one, job["path"]).result()
+            except BrokenProcessPool as e:
+                # A worker process died (e.g. OOM): later jobs get a new pool
+                batch.replace_pool(pool)
+                result = {"error": f"Failed to parse file: {str(e)}"}
+            except Exception as e:
+                result = {"error": f"Failed to parse file: {str(e)}"}
+            if "parsed_data" not in result:
+                self._fail(db, job["id"], result["error"])
+                return
+            db.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ? WHERE id = ?",
+                (json.dumps(result["parsed_data"]), time.time(), job["id"]),
+            )
+        except Exception as e:
+            logger.exception("Job %s failed", job["id"])
+            self._fail(db, job["id"], f"Failed to parse file: {str(e)}")
+            return
+        finally:
+            shutil.rmtree(Path(job["path"]).parent, ignore_errors=True)
+        if self.on_done is not None and job["digest"]:
+            try:
+                self.on_done(job["digest"], result["parsed_data"])
+            except Exception:
+                # The job's own result is recorded; only the cache / store / index missed it
+                logger.exception("on_done failed for job %s", job["id"])
+
+    def _fail(self, db, job_id, error):
+        try:
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (error, time.time(), job_id),
+            )
+        except sqlite3.Error:
+            # Left 'running': requeue_stale() picks it up after a restart
+            logger.exception("Could not mark job %s failed", job_id)
@@ -1,6 +1,9 @@
 # linkedin_websites_extractor.py
 import re
 
+import metrics
+
+@metrics.timed("extract_linkedin")
 def extract_linkedin(text: str):
     # Find all URLs in the text
     urls = re.findall(r"https?://[^\s]+", text)
@@ -10,5 +13,6 @@ def extract_linkedin(text: str):
             return url
     return None
 
+@metrics.timed("extract_websites")
 def extract_websites(text: str):
     return list(set(re.findall(r"https?://[^\s]+", text)))
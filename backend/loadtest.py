@@ -0,0 +1,590 @@
+# loadtest.py
+"""
+Synthetic CV corpus + concurrent load driver for the parse API, fully offline.
+
+    python loadtest.py generate synthetic/ --count 200 --pages 1-4 --scanned-ratio 0.3
+    python loadtest.py run synthetic/ --concurrency 8 --requests 400 --server-pid <gunicorn master pid>
+
+`generate` writes CVs in every format load_pages() reads: text PDF, scanned
+PDF (the page rendered as an image, so it goes through OCR), DOCX, PPTX and
+TXT, in the proportions of --mix. Content is random but CV-shaped (contact
+block, summary, skills, experience, education, projects, certifications,
+languages, referees), seeded, and padded with experience entries to the
+requested page count. A manifest.jsonl records each file's class.
+
+`run` posts the corpus to a running app (python app.py / gunicorn) from
+--concurrency threads and reports throughput and p50/p95/p99 latency per
+document class. Responses served from the result cache are reported as
+their own class ("<class> (cached)"): the corpus is cycled when --requests
+exceeds its size. With --server-pid the resident memory of that process and
+its children (the gunicorn workers) is sampled over the run.
+
+Scanned PDFs need Pillow; DOCX / PPTX need python-docx / python-pptx (all
+already required by the parser).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+CLASSES = ("text_pdf", "scanned_pdf", "docx", "pptx", "txt")
+EXTENSIONS = {"text_pdf": ".pdf", "scanned_pdf": ".pdf", "docx": ".docx", "pptx": ".pptx", "txt": ".txt"}
+SECTIONS = ("summary", "skills", "experience", "education", "projects", "certifications", "languages", "referees")
+LINES_PER_PAGE = 48
+RSS_SAMPLE_SECONDS = 1.0
+
+# --- Synthetic content ---
+FIRST_NAMES = ("Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sara", "John", "Maria", "Wei", "Fatima", "Lukas", "Emma")
+LAST_NAMES = ("Sharma", "Patel", "Iyer", "Khan", "Smith", "Garcia", "Chen", "Müller", "Okafor", "Rossi", "Nair", "Das")
+CITIES = ("Pune", "Bengaluru", "Mumbai", "Hyderabad", "Chennai", "London", "Berlin", "Toronto", "Singapore", "Dubai")
+NATIONALITIES = ("Indian", "British", "German", "Canadian", "Singaporean")
+DESIGNATIONS = (
+    "Software Engineer", "Data Scientist", "Project Manager", "Business Analyst", "DevOps Engineer",
+    "QA Engineer", "Product Manager", "ML Engineer", "Senior Engineer", "Consultant",
+)
+SKILLS = (
+    "Python", "Java", "SQL", "Docker", "Kubernetes", "AWS", "Azure", "Spark", "Pandas", "TensorFlow",
+    "PyTorch", "React", "Node.js", "Git", "Linux", "Terraform", "Tableau", "Excel", "Jira", "Airflow",
+)
+COMPANY_WORDS = ("Infosys", "Nimbus", "Vertex", "Orion", "Bluepeak", "Quantum", "Helix", "Sapphire", "Crest", "Northwind")
+COMPANY_SUFFIXES = ("Technologies", "Solutions Pvt Ltd", "Systems", "Labs", "Inc", "Consulting", "Services")
+UNIVERSITIES = (
+    "Indian Institute of Technology Bombay", "University of Pune", "Anna University", "University of Toronto",
+    "Technical University of Munich", "National Institute of Technology Trichy", "University of Manchester",
+)
+DEGREES = ("B.Tech in Computer Science", "M.Sc in Data Science", "MBA", "B.E. in Electronics", "M.Tech in AI")
+CERTIFICATIONS = (
+    "AWS Certified Solutions Architect", "Certified Kubernetes Administrator", "PMP Certification",
+    "Google Professional Data Engineer", "Microsoft Certified: Azure Fundamentals", "Scrum Master Certified",
+)
+LANGUAGES = ("English", "Hindi", "Marathi", "Tamil", "German", "French", "Spanish")
+VERBS = ("Built", "Designed", "Led", "Migrated", "Automated", "Optimised", "Maintained", "Delivered")
+OBJECTS = (
+    "a data pipeline processing 2 TB per day", "the customer onboarding service", "CI/CD for 40 microservices",
+    "a recommendation model lifting conversion by 8%", "the reporting dashboard used by sales",
+    "a search API serving 3k requests per second", "the legacy billing system", "an internal ML platform",
+)
+
+
+def _company(rng):
+    return f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}"
+
+
+def _experience_entry(rng, year):
+    start = year - rng.randint(1, 4)
+    lines = [f"{rng.choice(DESIGNATIONS)} - {_company(rng)}, {rng.choice(CITIES)} ({start} - {year})"]
+    lines += [f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)}." for _ in range(rng.randint(2, 4))]
+    return start, lines
+
+
+def cv_sections(rng, pages=1, sections=SECTIONS):
+    """[(heading, lines)] of one synthetic CV; heading None for the contact block."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    user = name.lower().replace(" ", ".").replace("ü", "u")
+    out = [(None, [
+        name,
+        rng.choice(DESIGNATIONS),
+        f"Email: {user}@{rng.choice(('gmail.com', 'outlook.com', 'yahoo.com'))}",
+        f"Phone: +91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}",
+        f"LinkedIn: linkedin.com/in/{user.replace('.', '-')}",
+        f"Location: {rng.choice(CITIES)}",
+        f"Nationality: {rng.choice(NATIONALITIES)}",
+        f"Date of Birth: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1975, 2001)}",
+    ])]
+    if "summary" in sections:
+        out.append(("Summary", [
+            f"{rng.choice(DESIGNATIONS)} with {rng.randint(2, 15)} years of experience in "
+            f"{', '.join(rng.sample(SKILLS, 3))}. {rng.choice(VERBS)} {rng.choice(OBJECTS)} and "
+            f"{rng.choice(VERBS).lower()} {rng.choice(OBJECTS)}.",
+        ]))
+    if "skills" in sections:
+        out.append(("Skills", [", ".join(rng.sample(SKILLS, rng.randint(5, 12)))]))
+    if "education" in sections:
+        out.append(("Education", [
+            f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)} ({rng.randint(2000, 2020)}) - CGPA: {rng.uniform(6.5, 9.8):.2f}/10"
+            for _ in range(rng.randint(1, 2))
+        ]))
+    if "projects" in sections:
+        out.append(("Projects", [
+            f"Project: {rng.choice(COMPANY_WORDS)} {rng.choice(('Insights', 'Tracker', 'Engine', 'Portal'))} - "
+            f"{rng.choice(VERBS).lower()} {rng.choice(OBJECTS)}"
+            for _ in range(rng.randint(1, 3))
+        ]))
+    if "certifications" in sections:
+        out.append(("Certifications", rng.sample(CERTIFICATIONS, rng.randint(1, 3))))
+    if "languages" in sections:
+        out.append(("Languages", [", ".join(rng.sample(LANGUAGES, rng.randint(2, 4)))]))
+    if "referees" in sections:
+        out.append(("References", [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}, {rng.choice(DESIGNATIONS)}, "
+                                   f"{_company(rng)}"]))
+    if "experience" in sections:
+        # Fill the page budget with experience entries
+        used = sum(len(lines) + 2 for _, lines in out)
+        lines, year = [], 2024
+        while not lines or used + len(lines) + 2 < pages * LINES_PER_PAGE:
+            year, entry = _experience_entry(rng, year)
+            lines += entry + [""]
+        out.insert(3 if "summary" in sections else 2, ("Work Experience", lines))
+    return out
+
+
+def cv_lines(sections):
+    lines = []
+    for heading, body in sections:
+        if heading:
+            lines += ["", heading.upper()]
+        lines += body
+    return lines
+
+
+def _paginate(lines, per_page=LINES_PER_PAGE, width=95):
+    wrapped = []
+    for line in lines:
+        while len(line) > width:
+            cut = line.rfind(" ", 0, width)
+            cut = cut if cut > 0 else width
+            wrapped.append(line[:cut])
+            line = line[cut:].lstrip()
+        wrapped.append(line)
+    return [wrapped[i:i + per_page] for i in range(0, len(wrapped), per_page)] or [[]]
+
+
+# --- Writers ---
+def write_txt(path, sections):
+    Path(path).write_text("\n".join(cv_lines(sections)), encoding="utf-8")
+
+
+def _pdf_string(text):
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_text_pdf(path, sections):
+    """A PDF with a real text layer (Helvetica, US Letter), written without any PDF library."""
+    pages = _paginate(cv_lines(sections))
+    objects = [None, None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in pages:
+        ops = ["BT", "/F1 10 Tf", "14 TL", "50 750 Td"] + [f"{_pdf_string(l)} Tj T*" for l in page] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        body = obj if isinstance(obj, bytes) else obj.encode("latin-1")
+        out += f"{n} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    Path(path).write_bytes(bytes(out))
+
+
+def _scan_font(size):
+    from PIL import ImageFont
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def write_scanned_pdf(path, sections, dpi=150, rng=None):
+    """Every page rendered to a greyscale image (no text layer), as a scanner would produce."""
+    from PIL import Image, ImageDraw
+    rng = rng or random.Random(0)
+    font = _scan_font(int(dpi / 7.2))  # ~10pt
+    line_height = int(dpi * 14 / 72)
+    images = []
+    for page in _paginate(cv_lines(sections)):
+        img = Image.new("L", (int(8.5 * dpi), 11 * dpi), 255)
+        draw = ImageDraw.Draw(img)
+        y = int(dpi * 0.6)
+        for line in page:
+            draw.text((int(dpi * 0.7), y), line, fill=0, font=font)
+            y += line_height
+        # A slight tilt, like a page on a flatbed
+        images.append(img.rotate(rng.uniform(-0.8, 0.8), fillcolor=255, resample=Image.BICUBIC))
+    images[0].save(path, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+
+
+def write_docx(path, sections):
+    from docx import Document
+    doc = Document()
+    for heading, body in sections:
+        if heading:
+            doc.add_heading(heading, level=2)
+        for line in body:
+            doc.add_paragraph(line)
+    doc.save(str(path))
+
+
+def write_pptx(path, sections):
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+    prs = Presentation()
+    layout = prs.slide_layouts[6]  # blank
+    for heading, body in sections:
+        for chunk in _paginate(body, per_page=18):
+            slide = prs.slides.add_slide(layout)
+            frame = slide.shapes.add_textbox(Inches(0.5), Inches(0.4), Inches(9), Inches(6.8)).text_frame
+            frame.word_wrap = True
+            frame.text = heading or ""
+            for line in chunk:
+                frame.add_paragraph().text = line
+            for paragraph in frame.paragraphs:
+                for run in paragraph.runs:
+                    run.font.size = Pt(12)
+    prs.save(str(path))
+
+
+def write_cv(path, kind, sections, rng=None):
+    if kind == "text_pdf":
+        write_text_pdf(path, sections)
+    elif kind == "scanned_pdf":
+        write_scanned_pdf(path, sections, rng=rng)
+    elif kind == "docx":
+        write_docx(path, sections)
+    elif kind == "pptx":
+        write_pptx(path, sections)
+    else:
+        write_txt(path, sections)
+
+
+def _parse_mix(mix, scanned_ratio):
+    """{class: weight} from "pdf=6,docx=2,pptx=1,txt=1"; pdf is split text / scanned."""
+    weights = {}
+    for item in mix.split(","):
+        kind, _, weight = item.partition("=")
+        kind, weight = kind.strip(), float(weight or 1)
+        if kind == "pdf":
+            weights["text_pdf"] = weights.get("text_pdf", 0) + weight * (1 - scanned_ratio)
+            weights["scanned_pdf"] = weights.get("scanned_pdf", 0) + weight * scanned_ratio
+        elif kind in CLASSES:
+            weights[kind] = weights.get(kind, 0) + weight
+        else:
+            raise ValueError(f"Unknown document class: {kind}. Use pdf, {', '.join(CLASSES)}")
+    return {k: w for k, w in weights.items() if w > 0}
+
+
+def _parse_range(value):
+    low, _, high = str(value).partition("-")
+    return int(low), int(high or low)
+
+
+def generate(out_dir, count, pages="1-2", mix="pdf=6,docx=2,pptx=1,txt=1", scanned_ratio=0.3,
+             sections=SECTIONS, seed=0):
+    """Write `count` CVs and manifest.jsonl to `out_dir`; returns the manifest entries."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    weights = _parse_mix(mix, scanned_ratio)
+    low, high = _parse_range(pages)
+    manifest = []
+    with open(out_dir / "manifest.jsonl", "w", encoding="utf-8") as f:
+        for n in range(count):
+            kind = rng.choices(list(weights), list(weights.values()))[0]
+            n_pages = rng.randint(low, high)
+            path = out_dir / f"cv_{n:05d}_{kind}{EXTENSIONS[kind]}"
+            content = cv_sections(rng, n_pages, sections)
+            write_cv(path, kind, content, rng=rng)
+            # Pages as laid out in a PDF (wrapping can add one to the target)
+            entry = {"file": path.name, "class": kind, "pages": len(_paginate(cv_lines(content)))}
+            manifest.append(entry)
+            f.write(json.dumps(entry) + "\n")
+    return manifest
+
+
+# --- Load driver ---
+def _multipart(filename, data):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode("utf-8") + data + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def post_file(url, filename, data, timeout):
+    """(HTTP status, seconds, parsed JSON body or None) of one upload."""
+    body, content_type = _multipart(filename, data)
+    req = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            status, payload = resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        status, payload = e.code, e.read()
+    except (urllib.error.URLError, OSError) as e:
+        return None, time.perf_counter() - start, {"error": str(e)}
+    elapsed = time.perf_counter() - start
+    try:
+        return status, elapsed, json.loads(payload)
+    except ValueError:
+        return status, elapsed, None
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return None
+
+
+def _process_tree(root):
+    """`root` and all its descendants (Linux /proc)."""
+    children = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # Field 4 of stat is the parent PID; the command name may contain spaces
+            ppid = int((entry / "stat").read_text().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+    tree, todo = [], [root]
+    while todo:
+        pid = todo.pop()
+        tree.append(pid)
+        todo += children.get(pid, [])
+    return tree
+
+
+class RssSampler:
+    """Samples the resident memory of a process tree every `interval` seconds, in a thread."""
+
+    def __init__(self, pid, interval=RSS_SAMPLE_SECONDS):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+
+    def _loop(self):
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            rss = {pid: _rss_kb(pid) for pid in _process_tree(self.pid)}
+            rss = {pid: kb for pid, kb in rss.items() if kb is not None}
+            self.samples.append({"t": round(time.perf_counter() - start, 2), "total_kb": sum(rss.values()), "pids": rss})
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self):
+        if not self.samples:
+            return {}
+        peak_by_pid = {}
+        for s in self.samples:
+            for pid, kb in s["pids"].items():
+                peak_by_pid[pid] = max(peak_by_pid.get(pid, 0), kb)
+        return {
+            "start_total_kb": self.samples[0]["total_kb"],
+            "end_total_kb": self.samples[-1]["total_kb"],
+            "peak_total_kb": max(s["total_kb"] for s in self.samples),
+            "peak_kb_by_pid": peak_by_pid,
+        }
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _latency_stats(latencies):
+    return {
+        "count": len(latencies),
+        "mean_s": round(sum(latencies) / len(latencies), 4),
+        "p50_s": round(percentile(latencies, 50), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "p99_s": round(percentile(latencies, 99), 4),
+        "max_s": round(max(latencies), 4),
+    }
+
+
+def load_corpus(corpus):
+    """[(path, class)]: from manifest.jsonl when present, else by file extension."""
+    corpus = Path(corpus)
+    manifest = corpus / "manifest.jsonl"
+    if manifest.exists():
+        entries = [json.loads(l) for l in manifest.read_text(encoding="utf-8").splitlines() if l.strip()]
+        return [(corpus / e["file"], e["class"]) for e in entries]
+    from batch import find_cvs
+    return [(p, p.suffix.lstrip(".").lower()) for p in find_cvs(corpus)]
+
+
+def run_load(corpus, url, concurrency=4, requests=None, duration=None, warmup=0, timeout=300,
+             server_pid=None, rss_interval=RSS_SAMPLE_SECONDS):
+    """
+    Post CVs from `corpus` to `url` from `concurrency` threads, `requests`
+    in total (default: the corpus once) or for `duration` seconds, after
+    `warmup` untimed requests. Returns the report.
+    """
+    docs = [(path, kind, path.read_bytes()) for path, kind in load_corpus(corpus)]
+    if not docs:
+        raise ValueError(f"No CVs in {corpus}")
+    total = requests if requests is not None else (None if duration else len(docs))
+    for i in range(warmup):
+        path, _, data = docs[i % len(docs)]
+        post_file(url, path.name, data, timeout)
+
+    lock = threading.Lock()
+    counter = iter(range(sys.maxsize))
+    results = []
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker():
+        while True:
+            with lock:
+                n = next(counter)
+            if (total is not None and n >= total) or (deadline is not None and time.perf_counter() >= deadline):
+                return
+            path, kind, data = docs[(warmup + n) % len(docs)]
+            status, elapsed, body = post_file(url, path.name, data, timeout)
+            ok = status == 200 and isinstance(body, dict) and "parsed_data" in body
+            if ok and body.get("cached"):
+                kind = f"{kind} (cached)"
+            with lock:
+                results.append({"class": kind, "status": status, "ok": ok, "seconds": elapsed,
+                                "field_errors": len((body or {}).get("parsed_data", {}).get("field_errors", {}))
+                                if ok else 0})
+
+    sampler = RssSampler(server_pid, rss_interval) if server_pid else None
+    start = time.perf_counter()
+    if sampler:
+        sampler.__enter__()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for fut in [pool.submit(worker) for _ in range(concurrency)]:
+                fut.result()
+    finally:
+        if sampler:
+            sampler.__exit__(None, None, None)
+    wall = time.perf_counter() - start
+
+    by_class = {}
+    for r in results:
+        by_class.setdefault(r["class"], []).append(r)
+    classes = {}
+    for kind, rows in sorted(by_class.items()):
+        ok = [r["seconds"] for r in rows if r["ok"]]
+        classes[kind] = dict(
+            _latency_stats(ok) if ok else {"count": 0},
+            errors=sum(not r["ok"] for r in rows),
+            degraded=sum(r["field_errors"] > 0 for r in rows),
+            throughput_rps=round(len(ok) / wall, 3),
+        )
+    ok_all = [r["seconds"] for r in results if r["ok"]]
+    report = {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(ok_all) / wall, 3) if wall else None,
+        "errors": sum(not r["ok"] for r in results),
+        "status_codes": {str(s): sum(r["status"] == s for r in results) for s in {r["status"] for r in results}},
+        "overall": _latency_stats(ok_all) if ok_all else {"count": 0},
+        "classes": classes,
+    }
+    if sampler:
+        report["rss"] = dict(sampler.summary(), samples=[
+            {"t": s["t"], "total_kb": s["total_kb"]} for s in sampler.samples
+        ])
+    return report
+
+
+def print_summary(report, out=sys.stderr):
+    print(f"{report['requests']} requests in {report['wall_s']}s at concurrency {report['concurrency']}: "
+          f"{report['throughput_rps']} req/s, {report['errors']} errors", file=out)
+    print(f"{'class':<24}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'err':>6}", file=out)
+    for kind, s in list(report["classes"].items()) + [("all", report["overall"])]:
+        if not s.get("count"):
+            print(f"{kind:<24}{0:>6}", file=out)
+            continue
+        print(f"{kind:<24}{s['count']:>6}{s['p50_s']:>9.3f}{s['p95_s']:>9.3f}{s['p99_s']:>9.3f}"
+              f"{s.get('throughput_rps', report['throughput_rps']):>9.2f}{s.get('errors', report['errors']):>6}",
+              file=out)
+    if "rss" in report and report["rss"].get("samples"):
+        rss = report["rss"]
+        print(f"server RSS: {rss['start_total_kb'] // 1024} MB at start, peak {rss['peak_total_kb'] // 1024} MB, "
+              f"{rss['end_total_kb'] // 1024} MB at end over {len(rss['peak_kb_by_pid'])} processes", file=out)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a synthetic CV corpus and load-test the parse API.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    g = sub.add_parser("generate")
+    g.add_argument("out")
+    g.add_argument("--count", type=int, default=100)
+    g.add_argument("--pages", default="1-2", help="page count or range per CV, e.g. 3 or 1-4")
+    g.add_argument("--mix", default="pdf=6,docx=2,pptx=1,txt=1",
+                   help="relative weights of pdf / docx / pptx / txt (or text_pdf / scanned_pdf)")
+    g.add_argument("--scanned-ratio", type=float, default=0.3, help="share of the pdf weight that is scanned")
+    g.add_argument("--sections", default=",".join(SECTIONS), help=f"sections to include, from {','.join(SECTIONS)}")
+    g.add_argument("--seed", type=int, default=0)
+
+    r = sub.add_parser("run")
+    r.add_argument("corpus")
+    r.add_argument("--url", default="http://127.0.0.1:5000/api/parse-cv",
+                   help="endpoint to post to; add query options here, e.g. ?near_duplicates=0")
+    r.add_argument("--concurrency", type=int, default=4)
+    r.add_argument("--requests", type=int, help="total requests (default: each CV once)")
+    r.add_argument("--duration", type=float, help="run for this many seconds instead")
+    r.add_argument("--warmup", type=int, default=0, help="untimed requests first")
+    r.add_argument("--timeout", type=float, default=300)
+    r.add_argument("--server-pid", type=int, help="sample the RSS of this process and its children")
+    r.add_argument("--rss-interval", type=float, default=RSS_SAMPLE_SECONDS)
+    r.add_argument("-o", "--out", help="JSON report file")
+    args = ap.parse_args(argv)
+
+    if args.command == "generate":
+        sections = [s.strip() for s in args.sections.split(",") if s.strip()]
+        unknown = sorted(set(sections) - set(SECTIONS))
+        if unknown:
+            ap.error(f"unknown section(s): {', '.join(unknown)}")
+        manifest = generate(args.out, args.count, args.pages, args.mix, args.scanned_ratio, sections, args.seed)
+        counts = {}
+        for entry in manifest:
+            counts[entry["class"]] = counts.get(entry["class"], 0) + 1
+        print(f"Wrote {len(manifest)} CVs to {args.out}: {json.dumps(counts)}", file=sys.stderr)
+        return 0
+
+    report = run_load(args.corpus, args.url, args.concurrency, args.requests, args.duration, args.warmup,
+                      args.timeout, args.server_pid, args.rss_interval)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print_summary(report)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# metrics.py
+"""
+Hot-path instrumentation, exported in the Prometheus text format.
+
+    @metrics.timed("extract_name")        time every call of a function
+    with metrics.stage("spacy_doc"): ...  time a block
+    metrics.inc("ocr_pages_total", 3)     counters
+    metrics.observe("document_chars", n)  size histograms
+
+Stage timings of the current request are also collected (see
+`collect_timings`) so the app can return them as a Server-Timing header.
+
+With CV_PARSER_METRICS=0 everything here is a no-op: `timed` returns the
+function unchanged and the other calls return immediately.
+Metrics are per process; with several gunicorn workers each one exports
+its own.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+ENABLED = os.environ.get("CV_PARSER_METRICS", "1").lower() not in ("0", "false", "no")
+
+PREFIX = "cv_parser_"
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = {
+    "document_pages": (1, 2, 3, 5, 10, 20, 50, 100),
+    "document_chars": (500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+}
+HELP = {
+    "stage_seconds": "Time spent per pipeline stage / extractor",
+    "request_seconds": "HTTP request latency per endpoint",
+    "document_pages": "Pages per PDF parsed",
+    "document_chars": "Characters of extracted text per document",
+    "ocr_documents_total": "Documents that needed OCR for at least one page",
+    "ocr_pages_total": "Pages sent to OCR",
+    "cache_requests_total": "Result cache lookups",
+}
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_histograms = {}   # (name, labels) -> {"buckets", "counts", "sum", "count"}
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, buckets=None, **labels):
+    if not ENABLED:
+        return
+    buckets = buckets or SIZE_BUCKETS.get(name, SECONDS_BUCKETS)
+    key = (name, _labels_key(labels))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for i, le in enumerate(buckets):
+            if value <= le:
+                h["counts"][i] += 1
+        h["sum"] += value
+        h["count"] += 1
+
+
+def record_stage(name, seconds):
+    observe("stage_seconds", seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def _stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+@contextmanager
+def _noop():
+    yield
+
+
+def stage(name):
+    return _stage(name) if ENABLED else _noop()
+
+
+def timed(name):
+    """Decorator timing every call as stage `name`."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_stage(name, time.perf_counter() - start)
+        return inner
+    return wrap
+
+
+def collect_timings():
+    """Start collecting stage timings for the current request / context."""
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+def stop_collecting():
+    _request_timings.set(None)
+
+
+def server_timing_header(timings):
+    """`Server-Timing` value: total milliseconds per stage, in first-seen order."""
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: dict(v, counts=list(v["counts"])) for k, v in _histograms.items()}
+
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+        full = PREFIX + name
+        if full not in seen:
+            seen.add(full)
+            lines.append(f"# HELP {full} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {full} counter")
+        lines.append(f"{full}{_fmt_labels(labels)} {value}")
+
+    for (name, labels), h in sorted(histograms.items()):
+        full = PREFIX + name
+        if full not in seen:
+            seen.add(full)
+            lines.append(f"# HELP {full} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {full} histogram")
+        for le, count in zip(h["buckets"], h["counts"]):
+            lines.append(f"{full}_bucket{_fmt_labels(labels, [('le', le)])} {count}")
+        lines.append(f"{full}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {h['count']}")
+        lines.append(f"{full}_sum{_fmt_labels(labels)} {h['sum']}")
+        lines.append(f"{full}_count{_fmt_labels(labels)} {h['count']}")
+    return "\n".join(lines) + "\n"
@@ -1,14 +1,18 @@
 # misc_extractor.py
+import metrics
+
 def extract_headshot():
     # Placeholder: integrate with vision model (face detection in CV)
     return None
 
+@metrics.timed("extract_is_resume_probability")
 def extract_is_resume_probability(text: str):
     # Heuristic: CV length and presence of keywords
     keywords = ["education", "experience", "skills", "projects"]
     score = sum(1 for k in keywords if k in text.lower())
     return min(100, (score / len(keywords)) * 100)
 
+@metrics.timed("extract_redacted_text")
 def extract_redacted_text(text: str):
     if "xxxx" in text or "[redacted]" in text.lower():
         return True
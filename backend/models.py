@@ -0,0 +1,219 @@
+# models.py
+"""
+Process-wide model registry.
+
+Every heavy model (spaCy, transformers pipelines) is loaded at most once per
+process, on first use, and shared by all extractors. Nothing is loaded at
+import time, so importing the app is cheap.
+
+To share memory between gunicorn workers, call `preload()` in the master
+before it forks (see gunicorn.conf.py); workers then inherit the already
+loaded models copy-on-write.
+"""
+import os
+import threading
+import time
+
+SPACY_MODEL = os.environ.get("CV_PARSER_SPACY_MODEL", "en_core_web_md")
+EDU_NER_MODEL = os.environ.get("CV_PARSER_EDU_NER_MODEL", "microsoft/deberta-v3-base")
+RESUME_NER_MODEL = os.environ.get("CV_PARSER_RESUME_NER_MODEL", "dslim/bert-base-NER")
+SUMMARY_MODEL = os.environ.get("CV_PARSER_SUMMARY_MODEL", "facebook/bart-large-cnn")
+# Runtime of the token-classification models: "torch" (fp32) or "onnx" (int8, see onnx_backend.py)
+NER_BACKEND = os.environ.get("CV_PARSER_NER_BACKEND", "torch")
+# Sentence boundaries from the statistical "senter" (fast) or the dependency "parser"
+SPACY_SENTENCES = os.environ.get("CV_PARSER_SPACY_SENTENCES", "senter")
+# nlp.pipe settings for documents parsed in bulk
+SPACY_BATCH_SIZE = int(os.environ.get("CV_PARSER_SPACY_BATCH_SIZE", "16"))
+SPACY_N_PROCESS = int(os.environ.get("CV_PARSER_SPACY_N_PROCESS", "1"))
+
+# What an extractor uses a Doc for -> the spaCy components that provide it.
+# Tokens and static word vectors need no component at all.
+SPACY_FEATURES = {
+    "tokens": (),
+    "ents": ("ner",),
+    "sents": ("senter",),
+    "pos": ("tagger", "attribute_ruler"),
+    "lemmas": ("tagger", "attribute_ruler", "lemmatizer"),
+    "deps": ("parser",),
+}
+
+# Models loaded by `preload()` when no explicit list is given.
+# "skills" is registered by nlp_model.py.
+DEFAULT_PRELOAD = ("spacy", "skills", "edu_ner", "summarizer")
+
+_loaders = {}
+_models = {}
+_load_times = {}
+_lock = threading.Lock()
+
+
+def register(name):
+    """Decorator registering a zero-argument loader under `name`."""
+    def wrap(fn):
+        _loaders[name] = fn
+        return fn
+    return wrap
+
+
+@register("spacy")
+def _load_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+
+def load_ner(model_id, backend=None):
+    """Aggregated-entity NER pipeline for `model_id` on `backend` (default NER_BACKEND)."""
+    backend = backend or NER_BACKEND
+    if backend == "onnx":
+        from onnx_backend import load_token_classification_pipeline
+        return load_token_classification_pipeline(model_id)
+    if backend != "torch":
+        raise ValueError(f"Unknown NER backend: {backend}. Use torch or onnx")
+    from transformers import pipeline
+    return pipeline("ner", model=model_id, aggregation_strategy="simple")
+
+
+@register("edu_ner")
+def _load_edu_ner():
+    return load_ner(EDU_NER_MODEL)
+
+
+@register("resume_ner")
+def _load_resume_ner():
+    return load_ner(RESUME_NER_MODEL)
+
+
+@register("summarizer")
+def _load_summarizer():
+    from transformers import pipeline
+    return pipeline("summarization", model=SUMMARY_MODEL)
+
+
+@register("summarizer_onnx")
+def _load_summarizer_onnx():
+    from onnx_backend import load_summarization_pipeline
+    return load_summarization_pipeline(SUMMARY_MODEL)
+
+
+def get(name):
+    """Return the model registered as `name`, loading it on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    if name not in _loaders:
+        raise KeyError(f"Unknown model: {name}")
+    with _lock:
+        model = _models.get(name)
+        if model is None:
+            start = time.perf_counter()
+            model = _loaders[name]()
+            _load_times[name] = time.perf_counter() - start
+            _models[name] = model
+    return model
+
+
+def get_nlp():
+    return get("spacy")
+
+
+_components = {}
+
+
+def spacy_components(features=None):
+    """
+    Names of the pipeline components, in pipeline order, that `features`
+    (keys of SPACY_FEATURES) need; the default pipeline when None.
+    """
+    nlp = get_nlp()
+    if features is None:
+        return list(nlp.pipe_names)
+    key = frozenset(features)
+    if key not in _components:
+        wanted = set()
+        for feature in features:
+            wanted.update(SPACY_FEATURES[feature])
+        if "senter" in wanted and (
+            SPACY_SENTENCES == "parser" or "parser" in wanted or "senter" not in nlp.component_names
+        ):
+            wanted.discard("senter")
+            wanted.add("parser")
+        # Components listening to a shared tok2vec need it to run first
+        for name in nlp.component_names:
+            listeners = getattr(nlp.get_pipe(name), "listening_components", None) or ()
+            if wanted & set(listeners):
+                wanted.add(name)
+        _components[key] = [n for n in nlp.component_names if n in wanted]
+    return _components[key]
+
+
+def spacy_doc(text, features=None):
+    """Doc of `text` running only the components `features` need (all when None)."""
+    nlp = get_nlp()
+    if features is None:
+        return nlp(text)
+    doc = nlp.make_doc(text)
+    for name in spacy_components(features):
+        doc = nlp.get_pipe(name)(doc)
+    return doc
+
+
+def spacy_docs(texts, features=None, batch_size=None, n_process=None):
+    """Docs of many texts through nlp.pipe, in order, with only the needed components."""
+    nlp = get_nlp()
+    batch_size = batch_size or SPACY_BATCH_SIZE
+    names = spacy_components(features)
+    disable = [n for n in nlp.pipe_names if n not in names]
+    docs = nlp.pipe(texts, disable=disable, batch_size=batch_size, n_process=n_process or SPACY_N_PROCESS)
+    # Components the model ships disabled (senter) cannot run inside nlp.pipe:
+    # apply them afterwards, in this process
+    for name in names:
+        if name not in nlp.pipe_names:
+            docs = nlp.get_pipe(name).pipe(docs, batch_size=batch_size)
+    return list(docs)
+
+
+def fingerprint() -> str:
+    """Identifies the configured model set; part of result cache keys."""
+    return ";".join([
+        f"spacy={SPACY_MODEL}",
+        f"sentences={SPACY_SENTENCES}",
+        f"edu_ner={EDU_NER_MODEL}",
+        f"ner_backend={NER_BACKEND}",
+        f"summarizer={SUMMARY_MODEL}",
+    ])
+
+
+def is_loaded(name) -> bool:
+    return name in _models
+
+
+def load_times():
+    """Seconds spent loading each model in this process."""
+    return dict(_load_times)
+
+
+def warm_up(names=DEFAULT_PRELOAD):
+    """
+    Load `names` and push a tiny input through each, so the first real
+    request does not pay for lazy initialisation inside the libraries.
+    """
+    for name in names:
+        model = get(name)
+        if name == "spacy":
+            model("Warm up")
+        elif name in ("summarizer", "summarizer_onnx"):
+            model("Warm up text for the summariser. " * 8, max_length=20, min_length=5, do_sample=False)
+        elif name in ("edu_ner", "resume_ner"):
+            model("John Smith studied at Stanford University.")
+
+
+def preload(names=None):
+    """
+    Load models in the current (parent) process before workers are forked.
+    `names` defaults to CV_PARSER_PRELOAD_MODELS (comma separated) or
+    DEFAULT_PRELOAD.
+    """
+    if names is None:
+        env = os.environ.get("CV_PARSER_PRELOAD_MODELS", "")
+        names = [n.strip() for n in env.split(",") if n.strip()] or DEFAULT_PRELOAD
+    warm_up(names)
@@ -0,0 +1,167 @@
+# near_duplicates.py
+"""
+Near-duplicate CV detection with MinHash + LSH.
+
+Each CV's extracted text is reduced to a MinHash signature (NUM_PERM
+minimum hashes over word shingles). The signature is split into BANDS bands
+of ROWS values; two CVs sharing any whole band are candidates, and the
+candidate whose signatures agree on at least NEAR_DUP_THRESHOLD of the
+values (estimated Jaccard similarity of their shingles) is a near
+duplicate. Bands are stored as (band, bucket) rows in SQLite, so a lookup
+is BANDS index probes however many signatures are stored.
+
+With 16 bands of 8 rows, CVs at 0.85 similarity are found ~99.9% of the
+time and ones below 0.5 almost never become candidates.
+
+Each signature can carry hashes of the CV's sections (see
+pipeline.section_hashes), so a near duplicate's fields are reused only
+where the text they are computed from is unchanged.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+
+NEAR_DUP_DB = os.environ.get("CV_PARSER_NEAR_DUP_DB", "near_duplicates.sqlite3")
+NEAR_DUP_THRESHOLD = float(os.environ.get("CV_PARSER_NEAR_DUP_THRESHOLD", "0.85"))
+SHINGLE_WORDS = 5
+BANDS = 16
+ROWS = 8
+NUM_PERM = BANDS * ROWS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures must stay comparable across processes and restarts
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)
+_WORD_REGEX = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    result_id TEXT PRIMARY KEY,
+    filename TEXT,
+    signature BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    result_id TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, result_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sections (
+    result_id TEXT PRIMARY KEY,
+    hashes TEXT NOT NULL
+);
+"""
+
+
+def shingles(text: str):
+    words = _WORD_REGEX.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(text: str):
+    """MinHash signature (NUM_PERM uint32 values) of `text`; None when it has no words."""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    # (a * h + b) mod p, truncated to 32 bits, for every permutation at once
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _buckets(sig):
+    for band in range(BANDS):
+        rows = sig[band * ROWS:(band + 1) * ROWS].tobytes()
+        # Signed 64-bit, as SQLite stores integers
+        yield band, int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), "little", signed=True)
+
+
+class NearDuplicateIndex:
+    def __init__(self, db_path=NEAR_DUP_DB, threshold=NEAR_DUP_THRESHOLD):
+        self.db_path = str(db_path)
+        self.threshold = threshold
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def add(self, result_id, sig, filename=None, sections=None):
+        """Store a signature, with the section hashes of the same text if given."""
+        if sig is None:
+            return
+        db = self._connect()
+        began = False
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            began = True
+            db.execute(
+                "INSERT OR REPLACE INTO signatures (result_id, filename, signature, created_at) VALUES (?, ?, ?, ?)",
+                (result_id, filename, sig.tobytes(), time.time()),
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, result_id) VALUES (?, ?, ?)",
+                [(band, bucket, result_id) for band, bucket in _buckets(sig)],
+            )
+            if sections is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO sections (result_id, hashes) VALUES (?, ?)",
+                    (result_id, json.dumps(sections, sort_keys=True)),
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            if began:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def find(self, sig, exclude=None):
+        """(result_id, similarity) of the most similar stored CV above the threshold, or None."""
+        if sig is None:
+            return None
+        buckets = list(_buckets(sig))
+        with self._connect() as db:
+            candidates = db.execute(
+                "SELECT DISTINCT s.result_id, s.signature FROM bands b JOIN signatures s ON s.result_id = b.result_id "
+                # ORed equalities: SQLite probes the primary key once per band
+                "WHERE " + " OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(buckets)),
+                [v for pair in buckets for v in pair],
+            ).fetchall()
+        best = None
+        for row in candidates:
+            if row["result_id"] == exclude:
+                continue
+            score = similarity(sig, np.frombuffer(row["signature"], dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (row["result_id"], score)
+        return best
+
+    def sections(self, result_id):
+        """Section hashes stored with a signature, or None."""
+        with self._connect() as db:
+            row = db.execute("SELECT hashes FROM sections WHERE result_id = ?", (result_id,)).fetchone()
+        return json.loads(row["hashes"]) if row is not None else None
+
+    def stats(self):
+        with self._connect() as db:
+            return {"signatures": db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]}
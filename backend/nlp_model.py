@@ -1,64 +1,145 @@
-import pytesseract
+import io
+import logging
+import os
+from functools import lru_cache
 from pathlib import Path
 from unidecode import unidecode
-import spacy
 import re
 import phonenumbers
-from rapidfuzz import process, fuzz
-from spacy.matcher import PhraseMatcher
 from docx import Document
-from pdf2image import convert_from_path
 import pdfplumber
 from pptx import Presentation
-from transformers import pipeline
+
+import metrics
+import models
+import skills_index
+from ocr import ocr_pdf
+
+logger = logging.getLogger(__name__)
 
 # --- CONFIG ---
-# Point pytesseract to the installed tesseract.exe location
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# OCR settings (DPI, page limit, workers, tesseract path) live in ocr.py
+
+# A PDF page is OCRed when pdfplumber finds fewer than OCR_MIN_PAGE_CHARS
+# characters on it and either nothing at all or images covering at least
+# OCR_MIN_IMAGE_COVERAGE of the page (a scan with a stray text layer)
+OCR_MIN_PAGE_CHARS = 50
+OCR_MIN_IMAGE_COVERAGE = 0.5
+# Documents are cut to their first MAX_PDF_PAGES pages and MAX_TEXT_CHARS
+# characters (0 = no limit); the rest is never read, OCRed or parsed
+MAX_PDF_PAGES = int(os.environ.get("CV_PARSER_MAX_PAGES", "30"))
+MAX_TEXT_CHARS = int(os.environ.get("CV_PARSER_MAX_TEXT_CHARS", "100000"))
+
+# Bump when the readers or the OCR page selection change the extracted text;
+# persisted page texts (artifacts.py) from another version are read again
+TEXT_STAGE_VERSION = "1"
 
-SPACY_MODEL = "en_core_web_md"
-resume_ner = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
-nlp = spacy.load(SPACY_MODEL)
-edu_ner = pipeline("ner", model="microsoft/deberta-v3-base", aggregation_strategy="simple")
+# Education NER runs on token windows of the education section, batched
+EDU_NER_WINDOW = int(os.environ.get("CV_PARSER_EDU_NER_WINDOW", "256"))
+EDU_NER_STRIDE = int(os.environ.get("CV_PARSER_EDU_NER_STRIDE", "32"))
+EDU_NER_BATCH_SIZE = int(os.environ.get("CV_PARSER_EDU_NER_BATCH_SIZE", "8"))
 
-# Path to your skills vocabulary
-SKILLS_FILE = Path(r"D:\TESTQ\resume_folder\paythonscript\skills.txt")
+# Bump whenever extractor logic changes the output for the same input;
+# cached results from another version are never served.
+PIPELINE_VERSION = "3"
 
-# --- Skills vocab load ---
-def load_skills_vocab(skills_file: Path):
-    lines = [unidecode(l.strip()) for l in skills_file.read_text(encoding="utf-8", errors="ignore").splitlines()]
-    skills = {l.lower() for l in lines if l}
-    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-    patterns = [nlp.make_doc(s) for s in skills]
-    for i in range(0, len(patterns), 5000):
-        matcher.add(f"SKILLS_{i//5000}", patterns[i:i+5000])
-    return skills, matcher
+# spaCy / transformers models are loaded lazily through the shared registry
+# (models.py): models.get_nlp(), models.get("edu_ner"), ...
 
-skills_vocab, skills_matcher = load_skills_vocab(SKILLS_FILE)
+# Skills vocabulary / prebuilt index: see skills_index.py
+# (CV_PARSER_SKILLS_FILE, CV_PARSER_SKILLS_INDEX)
+
+def pipeline_version() -> str:
+    # Includes the skills index version, so a reloaded vocabulary is a new
+    # version. Read from the index file: cache lookups never load the index.
+    return f"{PIPELINE_VERSION}|{models.fingerprint()}|skills={skills_index.version()}"
+
+# --- Skills index load (hot-reloaded by skills_index.current(); built here if missing) ---
+models.register("skills")(skills_index.load)
 
 # --- File readers ---
-def read_pdf_text(path: Path) -> str:
+# Every reader takes a source: a Path, the file's bytes, or a binary
+# file-like object (e.g. an upload's spooled buffer). Text layers are read in
+# memory; only OCR spools a scanned PDF to one temporary file (see ocr.ocr_pdf).
+def _as_file(source):
+    """Something pdfplumber / python-docx / python-pptx can open."""
+    if isinstance(source, (str, Path)):
+        return str(source)
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+def _as_ocr_input(source):
+    """Path string or bytes, the two forms ocr_pdf accepts."""
+    if isinstance(source, (str, Path)):
+        return str(source)
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+def _source_name(source) -> str:
+    if isinstance(source, (str, Path)):
+        return Path(source).name
+    return getattr(source, "name", None) or "upload"
+
+def read_pdf_text(path) -> str:
     chunks = []
-    with pdfplumber.open(str(path)) as pdf:
+    with pdfplumber.open(_as_file(path)) as pdf:
         for p in pdf.pages:
             chunks.append(p.extract_text() or "")
     return "\n".join(chunks)
 
-def read_pdf_ocr(path: Path) -> str:
-    text_parts = []
-    try:
-        images = convert_from_path(str(path), dpi=300)
-        for img in images:
-            txt = pytesseract.image_to_string(img, lang="eng")
-            if txt.strip():
-                text_parts.append(txt)
-    except Exception as e:
-        print(f"OCR failed for {path.name}: {e}")
-    return "\n".join(text_parts)
-
-def read_docx_text(path: Path) -> str:
+def _image_coverage(page) -> float:
+    area = float(page.width * page.height) or 1.0
+    covered = 0.0
+    for img in page.images:
+        w = max(0.0, min(img["x1"], page.width) - max(img["x0"], 0))
+        h = max(0.0, min(img["bottom"], page.height) - max(img["top"], 0))
+        covered += w * h
+    return min(1.0, covered / area)
+
+def _page_needs_ocr(page, text: str) -> bool:
+    chars = len("".join(text.split()))
+    if chars >= OCR_MIN_PAGE_CHARS:
+        return False
+    return chars == 0 or _image_coverage(page) >= OCR_MIN_IMAGE_COVERAGE
+
+def read_pdf_pages(path, max_pages: int = None):
+    """
+    Text of every page (the first `max_pages`, default MAX_PDF_PAGES), in
+    order: the pdfplumber text layer where it is usable, OCR for the pages
+    that look scanned.
+    """
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    texts = []
+    ocr_pages = []
+    with pdfplumber.open(_as_file(path)) as pdf:
+        pages = pdf.pages
+        if max_pages and len(pages) > max_pages:
+            metrics.inc("documents_truncated_total", limit="pages")
+            pages = pages[:max_pages]
+        for page_no, p in enumerate(pages, 1):
+            txt = p.extract_text() or ""
+            texts.append(txt)
+            if _page_needs_ocr(p, txt):
+                ocr_pages.append(page_no)
+    metrics.observe("document_pages", len(texts))
+    if ocr_pages:
+        metrics.inc("ocr_documents_total")
+        metrics.inc("ocr_pages_total", len(ocr_pages))
+        try:
+            for page_no, txt in zip(ocr_pages, ocr_pdf(_as_ocr_input(path), ocr_pages)):
+                if txt.strip():
+                    texts[page_no - 1] = txt
+        except Exception as e:
+            logger.warning("OCR failed for %s: %s", _source_name(path), e)
+    return texts
+
+def read_docx_text(path) -> str:
     try:
-        doc = Document(str(path))
+        doc = Document(_as_file(path))
         texts = [p.text for p in doc.paragraphs if p.text.strip()]
         for table in doc.tables:
             for row in table.rows:
@@ -69,9 +150,9 @@ def read_docx_text(path: Path) -> str:
     except Exception:
         return ""
 
-def read_pptx_text(path: Path) -> str:
+def read_pptx_text(path) -> str:
     try:
-        prs = Presentation(str(path))
+        prs = Presentation(_as_file(path))
         texts = []
         for slide in prs.slides:
             for shape in slide.shapes:
@@ -81,18 +162,43 @@ def read_pptx_text(path: Path) -> str:
     except Exception:
         return ""
 
-def load_text(path: Path) -> str:
-    ext = path.suffix.lower()
+@metrics.timed("load_text")
+def load_pages(path, filename: str = None) -> list:
+    """
+    Text of every page of a PDF; other formats are one page. `path` may also
+    be bytes or a binary file-like object; `filename` then supplies the
+    extension that picks the reader.
+    """
+    ext = Path(filename or _source_name(path)).suffix.lower()
     if ext == ".pdf":
-        txt = read_pdf_text(path)
-        return txt if txt.strip() else read_pdf_ocr(path)
+        return read_pdf_pages(path)
     if ext in [".docx", ".doc"]:
-        return read_docx_text(path)
+        return [read_docx_text(path)]
     if ext == ".pptx":
-        return read_pptx_text(path)
+        return [read_pptx_text(path)]
     if ext in [".txt", ".rtf", ".md"]:
-        return path.read_text(errors="ignore")
-    return ""
+        if isinstance(path, (str, Path)):
+            return [Path(path).read_text(errors="ignore")]
+        data = path if isinstance(path, (bytes, bytearray)) else _as_file(path).read()
+        return [bytes(data).decode("utf-8", errors="ignore")]
+    return [""]
+
+def limit_pages(pages, max_chars: int = None):
+    """`pages` cut so that their text has at most `max_chars` (default MAX_TEXT_CHARS) characters."""
+    max_chars = MAX_TEXT_CHARS if max_chars is None else max_chars
+    if not max_chars or sum(len(p) + 1 for p in pages) - 1 <= max_chars:
+        return pages
+    metrics.inc("documents_truncated_total", limit="chars")
+    out, left = [], max_chars
+    for page in pages:
+        if left <= 0:
+            break
+        out.append(page[:left])
+        left -= len(page) + 1
+    return out
+
+def load_text(path, filename: str = None) -> str:
+    return "\n".join(limit_pages(load_pages(path, filename)))
 
 # --- Core regexes & helpers ---
 EMAIL_REGEX = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
@@ -113,36 +219,89 @@ ORG_HINTS = re.compile(
     r"\b(university|college|institute|school|academy|polytechnic|technological|technology|institute of|iit|iiit|nit|company|inc\.?|ltd\.?|llc|solutions|technologies|labs|systems)\b",
     re.I,
 )
+# Matches a line if any of the section keyword patterns above would
+SECTION_KEYWORDS = re.compile(
+    "|".join(f"(?:{rx.pattern})" for rx in (EDU_KEYWORDS, PROJECT_KEYWORDS, EXP_KEYWORDS)),
+    re.I,
+)
 
+# List of common email domain keywords
+EMAIL_DOMAINS = (
+    "gmail.com", "yahoo.com", "outlook.com", "icloud.com", "hotmail.com",
+    "rediffmail.com", "protonmail.com", "aol.com", "live.com", "msn.com",
+    "yandex.com", "zoho.com", "mail.com", "gmx.com", "edu", "ac.in", "co.in"
+)
+MAILTO_REGEX = re.compile(r"mailto:([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})", re.I)
+PHONE_CANDIDATE_REGEX = re.compile(r"(?:\+?\d[\d\s().-]{6,}\d)")
+
+# List of popular designations
+POPULAR_DESIGNATIONS = (
+    "software engineer", "data scientist", "project manager", "business analyst", "product manager",
+    "developer", "designer", "consultant", "architect", "administrator", "specialist", "intern",
+    "student", "associate", "officer", "coordinator", "executive", "qa engineer", "ml engineer",
+    "ai engineer", "devops engineer", "quality analyst", "principal engineer", "senior engineer",
+    "junior engineer", "lead engineer", "chief technology officer", "cto", "chief executive officer", "ceo"
+)
+DESIGNATION_REGEX = re.compile(r"\b(" + "|".join(re.escape(d) for d in POPULAR_DESIGNATIONS) + r")\b", re.I)
+NATIONALITY_REGEX = re.compile(r"(?:nationality|citizenship)\s*[:\-]\s*([A-Za-z ]{3,30})", re.I)
+
+MULTISPACE_REGEX = re.compile(r"\s{2,}")
+PROJECT_LINE_REGEX = re.compile(r"\bproject\b", re.I)
+PROJECT_BLOCK_LINE_REGEX = re.compile(r"\b(project|capstone|thesis)\b", re.I)
+PROJECT_NAME_SPLIT_REGEX = re.compile(r"[:\-–•]")
+
+# --- Past-company heuristics ---
+# Company suffixes to look for (lowercase)
+COMPANY_SUFFIXES = (
+    "pvt ltd", "private limited", "inc", "llc", "ltd", "technologies", "solutions", "systems", "labs",
+    "group", "corporation", "corp", "enterprises", "consulting", "industries", "services"
+)
+# Programming languages to exclude (lowercase)
+PROGRAMMING_LANGUAGES = (
+    "python", "java", "c++", "c#", "javascript", "typescript", "go", "ruby", "php", "swift", "kotlin", "scala", "r", "matlab", "perl", "dart"
+)
+# Education keywords to exclude
+COMPANY_EDU_KEYWORDS = (
+    "university", "college", "institute", "school", "academy", "iit", "nit", "polytechnic", "education"
+)
+_SUFFIX_ALTERNATION = "|".join(re.escape(suf) for suf in COMPANY_SUFFIXES)
+# Whole-word suffix anywhere in a name
+COMPANY_SUFFIX_REGEX = re.compile(r"\b(?:" + _SUFFIX_ALTERNATION + r")\b", re.I)
+# Cheap pre-check: a line can only match a per-suffix line pattern if this matches
+COMPANY_SUFFIX_END_REGEX = re.compile(r"(?:" + _SUFFIX_ALTERNATION + r")\b", re.I)
+# Per suffix, in priority order: company-like run of text ending in it ...
+COMPANY_LINE_PATTERNS = tuple(
+    re.compile(r"([A-Z][A-Za-z0-9&.,'()\- ]+?\s*" + re.escape(suf) + r"\b[^\n]*)", re.I)
+    for suf in COMPANY_SUFFIXES
+)
+# ... and the base name up to and including it
+COMPANY_BASE_PATTERNS = tuple(
+    re.compile(r"(.+?\b" + re.escape(suf) + r"\b)", re.I) for suf in COMPANY_SUFFIXES
+)
+COMPANY_LIKE_REGEX = re.compile(r"([A-Z][A-Za-z0-9&.,'()\- ]{2,})")
+
+@metrics.timed("extract_emails")
 def extract_emails(text: str):
-    # List of common email domain keywords
-    email_domains = [
-        "gmail.com", "yahoo.com", "outlook.com", "icloud.com", "hotmail.com",
-        "rediffmail.com", "protonmail.com", "aol.com", "live.com", "msn.com",
-        "yandex.com", "zoho.com", "mail.com", "gmx.com", "edu", "ac.in", "co.in"
-    ]
-    # Standard email regex
-    email_regex = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
-    raw_emails = [e.rstrip('.,;:') for e in email_regex.findall(text)]
+    raw_emails = [e.rstrip('.,;:') for e in EMAIL_REGEX.findall(text)]
 
     # Also search for mailto: links
-    mailto_regex = re.compile(r"mailto:([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})", re.I)
-    mailto_emails = [m.group(1) for m in mailto_regex.finditer(text)]
+    mailto_emails = [m.group(1) for m in MAILTO_REGEX.finditer(text)]
 
     all_emails = raw_emails + mailto_emails
 
     # Prefer emails with known domains
     for email in all_emails:
-        if any(domain in email.lower() for domain in email_domains):
+        if any(domain in email.lower() for domain in EMAIL_DOMAINS):
             return email
     # If none match known domains, return the first found email if any
     if all_emails:
         return all_emails[0]
     return None
 
+@metrics.timed("extract_phone_numbers")
 def extract_phone_numbers(text: str, default_region: str = None, max_candidates: int = 5):
     candidates = set()
-    rough = re.findall(r"(?:\+?\d[\d\s().-]{6,}\d)", text)
+    rough = PHONE_CANDIDATE_REGEX.findall(text)
     for r in rough[:200]:
         try:
             for match in phonenumbers.PhoneNumberMatcher(r, default_region or "IN"):
@@ -153,48 +312,81 @@ def extract_phone_numbers(text: str, default_region: str = None, max_candidates:
             pass
     return list(candidates)[:max_candidates]
 
+@metrics.timed("extract_name")
 def extract_name(doc, text):
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    header_doc = nlp("\n".join(lines[:20]))
-    persons = [ent for ent in header_doc.ents if ent.label_ == "PERSON"] or [ent for ent in doc.ents if ent.label_ == "PERSON"]
+    # Header = first 20 non-empty lines, looked up as a span of the shared Doc
+    offsets = _line_offsets(doc.text)
+    header = _lines_span(doc, offsets, 0, 20)
+    header_ents = header.ents if header is not None else []
+    persons = [ent for ent in header_ents if ent.label_ == "PERSON"] or [ent for ent in doc.ents if ent.label_ == "PERSON"]
     return persons[0].text.strip() if persons else ""
 
+@metrics.timed("extract_designation")
 def extract_designation(text):
-    # List of popular designations
-    popular_designations = [
-        "software engineer", "data scientist", "project manager", "business analyst", "product manager",
-        "developer", "designer", "consultant", "architect", "administrator", "specialist", "intern",
-        "student", "associate", "officer", "coordinator", "executive", "qa engineer", "ml engineer",
-        "ai engineer", "devops engineer", "quality analyst", "principal engineer", "senior engineer",
-        "junior engineer", "lead engineer", "chief technology officer", "cto", "chief executive officer", "ceo"
-    ]
-    # Compile regex for popular designations
-    designation_regex = re.compile(r"\b(" + "|".join(re.escape(d) for d in popular_designations) + r")\b", re.I)
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     for l in lines[:30]:
-        m = designation_regex.search(l)
+        m = DESIGNATION_REGEX.search(l)
         if m:
             return m.group(1)
     return None
 
+@metrics.timed("extract_nationality")
 def extract_nationality(doc, text):
-    m = re.search(r"(?:nationality|citizenship)\s*[:\-]\s*([A-Za-z ]{3,30})", text, re.I)
+    m = NATIONALITY_REGEX.search(text)
     return m.group(1).strip().title() if m else ""
 
-def extract_skills(text: str, doc, skills_vocab, skills_matcher, fuzz_threshold=92):
-    found = set()
-    matches = skills_matcher(doc)
-    for _, start, end in matches:
-        found.add(doc[start:end].text)
-    return sorted(found)
+@metrics.timed("extract_skills")
+def extract_skills(text: str, doc, index=None):
+    # Canonical names, one per skill whatever its spelling in the CV
+    index = index or skills_index.current()
+    return index.names(index.match(doc))
 
 # ------- New: Education, GPA, Projects, Past Companies --------
+def _line_offsets(text):
+    """
+    (start, end) character offsets of every non-empty line of `text`, with
+    surrounding whitespace trimmed. Index i matches the i-th entry of
+    `[l.strip() for l in text.splitlines() if l.strip()]`.
+    """
+    offsets = []
+    pos = 0
+    for raw in text.splitlines(keepends=True):
+        stripped = raw.strip()
+        if stripped:
+            start = pos + raw.index(stripped)
+            offsets.append((start, start + len(stripped)))
+        pos += len(raw)
+    return offsets
+
+def _lines_span(doc, offsets, start, end):
+    """spaCy Span of `doc` covering lines[start:end], or None if the range is empty."""
+    end = min(end, len(offsets))
+    if start >= end:
+        return None
+    return doc.char_span(offsets[start][0], offsets[end - 1][1], alignment_mode="expand")
+
+@lru_cache(maxsize=16)
+def _section_headers(lines: tuple):
+    """
+    Header line indexes for every section keyword pattern, from one pass over
+    the lines. Cached, since several extractors ask about the same lines.
+    """
+    headers = {EDU_KEYWORDS: [], PROJECT_KEYWORDS: [], EXP_KEYWORDS: []}
+    for i, l in enumerate(lines):
+        if SECTION_KEYWORDS.search(l):
+            for keyword_regex, found in headers.items():
+                if keyword_regex.search(l):
+                    found.append(i)
+    return headers
+
 def _find_section_blocks(lines, keyword_regex, window=80):
     """
     Return indexes of lines that likely start a section (Education/Projects/Experience),
     and the slice of lines belonging to that section until next section header.
     """
-    headers = [i for i, l in enumerate(lines) if keyword_regex.search(l)]
+    headers = _section_headers(tuple(lines)).get(keyword_regex)
+    if headers is None:
+        headers = [i for i, l in enumerate(lines) if keyword_regex.search(l)]
     blocks = []
     for idx, h in enumerate(headers):
         start = h
@@ -202,14 +394,80 @@ def _find_section_blocks(lines, keyword_regex, window=80):
         blocks.append((start, end))
     return blocks
 
-def extract_education_and_gpa(text, doc=None):
-    # Use NER to extract entities
-    entities = edu_ner(text)
+def _education_text(text):
+    """Lines of the education section(s), or the whole text if none is found."""
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    keep = sorted({i for (s, e) in _find_section_blocks(lines, EDU_KEYWORDS) for i in range(s, e)})
+    return "\n".join(lines[i] for i in keep) if keep else text
+
+def _token_windows(text, tokenizer, window=EDU_NER_WINDOW, stride=EDU_NER_STRIDE):
+    """
+    Split `text` into pieces of at most `window` model tokens, consecutive
+    pieces overlapping by `stride` tokens so no entity is cut in half.
+    """
+    if not text.strip():
+        return []
+    if not getattr(tokenizer, "is_fast", False):
+        # No offset mapping: approximate with ~4 characters per token
+        size, step = window * 4, (window - stride) * 4
+        return [text[i:i + size] for i in range(0, max(1, len(text) - stride * 4), step)]
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    chunks = []
+    for i in range(0, len(offsets), window - stride):
+        last = min(i + window, len(offsets)) - 1
+        chunks.append(text[offsets[i][0]:offsets[last][1]])
+        if last == len(offsets) - 1:
+            break
+    return chunks
+
+def education_entities(texts):
+    """
+    edu_ner entities for each text in `texts`, scoped to the education
+    section and run as one batched pipeline call over all token windows.
+    """
+    ner = models.get("edu_ner")
+    chunks, owners = [], []
+    for n, text in enumerate(texts):
+        for chunk in _token_windows(_education_text(text), ner.tokenizer):
+            chunks.append(chunk)
+            owners.append(n)
+    results = [[] for _ in texts]
+    if chunks:
+        with metrics.stage("edu_ner"):
+            outputs = ner(chunks, batch_size=EDU_NER_BATCH_SIZE)
+        if len(chunks) == 1 and outputs and isinstance(outputs[0], dict):
+            outputs = [outputs]  # single input may come back unwrapped
+        for n, ents in zip(owners, outputs):
+            results[n].extend(ents)
+    return results
+
+def prefetch_education(pdocs):
+    """Fill `edu_entities` of many documents with one batched NER pass (bulk mode)."""
+    todo = [p for p in pdocs if p.edu_entities is None and not p.is_empty]
+    for pdoc, ents in zip(todo, education_entities([p.text_ascii for p in todo])):
+        pdoc.edu_entities = ents
+
+def prefetch_docs(pdocs, features=None):
+    """Build the Docs of many documents with one nlp.pipe call (bulk mode)."""
+    todo = [p for p in pdocs if p._doc is None and not p.is_empty]
+    if not todo:
+        return
+    with metrics.stage("spacy_doc"):
+        docs = models.spacy_docs([p.text_ascii for p in todo], features)
+    for pdoc, doc in zip(todo, docs):
+        pdoc.spacy_features = features
+        pdoc._doc = doc
+
+@metrics.timed("extract_education_and_gpa")
+def extract_education_and_gpa(text, doc=None, entities=None):
+    # Use NER to extract entities (precomputed when called from a batch)
+    if entities is None:
+        entities = education_entities([text])[0]
     institutions = set()
     results = []
 
     # Patterns for GPA
-    gpa_regex = re.compile(r"\b(?:CGPA|GPA)\s*[:=]?\s*(\d(?:\.\d{1,2})?)\s*(?:/|\bout of\b)?\s*(?:10|4)?", re.I)
+    gpa_regex = GPA_REGEX
 
     # Collect institutes and GPA from NER
     for ent in entities:
@@ -226,11 +484,19 @@ def extract_education_and_gpa(text, doc=None):
     # --- Fallback: keyword-based section parsing ---
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     blocks = _find_section_blocks(lines, EDU_KEYWORDS)
+    if blocks and doc is None:
+        doc = models.spacy_doc(text, ["ents"])
+    offsets = _line_offsets(doc.text) if blocks else []
+
+    def line_has_org(n):
+        span = _lines_span(doc, offsets, n, n + 1)
+        return span is not None and any(ent.label_ == "ORG" for ent in span.ents)
+
     for (s, e) in blocks:
         block = lines[s:e]
         for i, ln in enumerate(block):
-            # Look for org-like education hints
-            org_like = ORG_HINTS.search(ln) or any(ent.label_ == "ORG" and ent.text in ln for ent in nlp(ln).ents)
+            # Look for org-like education hints (ORG entities come from the shared Doc)
+            org_like = ORG_HINTS.search(ln) or line_has_org(s + i)
             if org_like:
                 inst_clean = ln.strip()
                 if inst_clean.lower() not in institutions:
@@ -253,31 +519,33 @@ def extract_education_and_gpa(text, doc=None):
                         results[-1]["gpa"] = g.group(1)
     return results
 
+@metrics.timed("extract_projects")
 def extract_projects(text):
     lines = [l.strip(" -•\t") for l in text.splitlines() if l.strip()]
     blocks = _find_section_blocks(lines, PROJECT_KEYWORDS)
     names = []
 
     def add(n):
-        n = re.sub(r"\s{2,}", " ", n).strip()
+        n = MULTISPACE_REGEX.sub(" ", n).strip()
         if n and n.lower() not in {x.lower() for x in names}:
             names.append(n)
 
     if not blocks:
         # Fallback: any line containing 'project'
         for ln in lines:
-            if re.search(r"\bproject\b", ln, re.I) and len(ln) < 140:
+            if PROJECT_LINE_REGEX.search(ln) and len(ln) < 140:
                 add(ln)
         return names
 
     for (s, e) in blocks:
         for ln in lines[s:e]:
-            if re.search(r"\b(project|capstone|thesis)\b", ln, re.I):
+            if PROJECT_BLOCK_LINE_REGEX.search(ln):
                 # Heuristic: keep first part before delimiter as the "name"
-                name = re.split(r"[:\-–•]", ln, 1)[0]
+                name = PROJECT_NAME_SPLIT_REGEX.split(ln, 1)[0]
                 add(name)
     return names
 
+@metrics.timed("extract_past_companies")
 def extract_past_companies(text: str, doc=None):
     """
     Extract past companies from resume text using spaCy ORG entities and regex,
@@ -288,23 +556,8 @@ def extract_past_companies(text: str, doc=None):
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     blocks = _find_section_blocks(lines, EXP_KEYWORDS)
 
-    # Company suffixes to look for (lowercase)
-    company_suffixes = [
-        "pvt ltd", "private limited", "inc", "llc", "ltd", "technologies", "solutions", "systems", "labs",
-        "group", "corporation", "corp", "enterprises", "consulting", "industries", "services"
-    ]
-    # Programming languages to exclude (lowercase)
-    programming_languages = [
-        "python", "java", "c++", "c#", "javascript", "typescript", "go", "ruby", "php", "swift", "kotlin", "scala", "r", "matlab", "perl", "dart"
-    ]
-    # Education keywords to exclude
-    edu_keywords = [
-        "university", "college", "institute", "school", "academy", "iit", "nit", "polytechnic", "education"
-    ]
-
     def has_company_suffix(name):
-        name_l = name.lower()
-        return any(re.search(r"\b" + re.escape(suf) + r"\b", name_l) for suf in company_suffixes)
+        return COMPANY_SUFFIX_REGEX.search(name) is not None
 
     def is_valid_company(name):
         name_l = name.lower()
@@ -312,9 +565,9 @@ def extract_past_companies(text: str, doc=None):
         if not has_company_suffix(name):
             return False
         # Exclude if contains education keywords or programming languages
-        if any(edu in name_l for edu in edu_keywords):
+        if any(edu in name_l for edu in COMPANY_EDU_KEYWORDS):
             return False
-        if any(lang in name_l for lang in programming_languages):
+        if any(lang in name_l for lang in PROGRAMMING_LANGUAGES):
             return False
         # Exclude if too short or generic
         if len(name.split()) < 2 or len(name) < 4:
@@ -328,43 +581,46 @@ def extract_past_companies(text: str, doc=None):
         Extract the base company name up to and including the first company suffix.
         """
         name = full_name
-        for suf in company_suffixes:
-            pattern = r"(.+?\b" + re.escape(suf) + r"\b)"
-            m = re.search(pattern, name, re.I)
-            if m:
-                return m.group(1).strip().lower()
+        if has_company_suffix(name):
+            for pattern in COMPANY_BASE_PATTERNS:
+                m = pattern.search(name)
+                if m:
+                    return m.group(1).strip().lower()
         return name.strip().lower()
 
     def add(c):
-        c = re.sub(r"\s{2,}", " ", c).strip()
+        c = MULTISPACE_REGEX.sub(" ", c).strip()
         if c and is_valid_company(c):
             companies_raw.append(c)
 
+    if doc is None:
+        doc = models.spacy_doc(text, ["ents"])
+    offsets = _line_offsets(doc.text)
+
     # spaCy ORG entities from experience blocks
     if blocks:
         for (s, e) in blocks:
-            seg = "\n".join(lines[s:e])
-            seg_doc = nlp(seg)
-            for ent in seg_doc.ents:
+            seg_span = _lines_span(doc, offsets, s, e)
+            for ent in (seg_span.ents if seg_span is not None else []):
                 if ent.label_ == "ORG":
                     add(ent.text)
             for ln in lines[s:e]:
                 # Regex for company-like lines
-                m = re.search(r"([A-Z][A-Za-z0-9&.,'()\- ]{2,})", ln)
+                m = COMPANY_LIKE_REGEX.search(ln)
                 if m and has_company_suffix(m.group(1)):
                     add(m.group(1))
     else:
-        gdoc = nlp(text)
-        for ent in gdoc.ents:
+        for ent in doc.ents:
             if ent.label_ == "ORG":
                 add(ent.text)
 
     # Also extract from lines using suffixes
     for line in lines:
-        for suf in company_suffixes:
-            pattern = r"([A-Z][A-Za-z0-9&.,'()\- ]+?\s*" + re.escape(suf) + r"\b[^\n]*)"
-            found = re.findall(pattern, line, re.I)
-            for f in found:
+        # Most lines mention no suffix at all: one scan rules them out
+        if not COMPANY_SUFFIX_END_REGEX.search(line):
+            continue
+        for pattern in COMPANY_LINE_PATTERNS:
+            for f in pattern.findall(line):
                 if is_valid_company(f):
                     companies_raw.append(f.strip())
 
@@ -380,34 +636,63 @@ def extract_past_companies(text: str, doc=None):
     return sorted({v.strip().title() for v in base_to_full.values()})
 
 
+# --- Shared document context ---
+class ParsedDocument:
+    """
+    Everything the extractors need about one CV, built once per upload:
+    the raw text, its ASCII transliteration, the non-empty lines of the
+    ASCII text and a single spaCy Doc over it (parsed on first access).
+    The Doc runs only the components for `spacy_features` (see
+    models.SPACY_FEATURES; None runs the whole pipeline).
+    """
+
+    def __init__(self, raw_text: str, source: str = "", pages=None, text_ascii=None):
+        self.source = source
+        self.raw_text = raw_text
+        # Page texts as read (raw_text is their join); None when not known
+        self.pages = pages
+        self.text_ascii = text_ascii if text_ascii is not None else unidecode(raw_text)
+        metrics.observe("document_chars", len(raw_text))
+        self.lines = [l.strip() for l in self.text_ascii.splitlines() if l.strip()]
+        self._doc = None
+        # edu_ner output, filled by prefetch_education() in bulk mode
+        self.edu_entities = None
+        self.spacy_features = None
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            with metrics.stage("spacy_doc"):
+                self._doc = models.spacy_doc(self.text_ascii, self.spacy_features)
+        return self._doc
+
+    def use_spacy_features(self, features):
+        """Build the Doc (if not built yet) with only the components for `features`."""
+        if self._doc is None:
+            self.spacy_features = features
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.raw_text.strip()
+
+def load_document(path, filename: str = None) -> ParsedDocument:
+    """Read a Path, bytes or file-like object (see load_pages) into a ParsedDocument."""
+    pages = limit_pages(load_pages(path, filename))
+    return ParsedDocument("\n".join(pages), source=filename or _source_name(path), pages=pages)
+
+
 # --- Public entry point ---
-def extract_details_from_file(file_path: str):
-    text = load_text(Path(file_path))
-    if not text.strip():
-        return {"error": "File is empty or unreadable"}
-
-    text_ascii = unidecode(text)
-    doc = nlp(text_ascii)
-
-    # Existing fields
-    base = {
-        "name": extract_name(doc, text_ascii),
-        "phone_number": "; ".join(extract_phone_numbers(text_ascii)),
-        # "email": "; ".join(extract_emails(text_ascii)),
-        "email": extract_emails(text_ascii),
-        "designation": extract_designation(text_ascii),
-        "skills": "; ".join(extract_skills(text_ascii, doc, skills_vocab, skills_matcher)),
-        "nationality": extract_nationality(doc, text_ascii),
-    }
-
-    # New fields
-    education = extract_education_and_gpa(text_ascii, doc)  
-    projects = extract_projects(text_ascii)                 
-    past_companies = extract_past_companies(text_ascii, doc)
-
-    base.update({
-        "education": education,
-        "projects": projects,
-        "past_companies": past_companies,
-    })
-    return base
+def extract_details_from_file(file_path: str, fields=None, profile=None):
+    """
+    Parse a CV file: every field, or only `fields` (names, or a
+    comma-separated string) or a `profile` ("contact", "no-summary", "full";
+    see extractors.PROFILES). Same record as /api/parse-cv.
+    """
+    import extractors  # imports this module
+    selection = extractors.resolve_fields(fields, profile or extractors.DEFAULT_PROFILE)
+    return extract_details(load_document(Path(file_path)), fields=selection)
+
+def extract_details(pdoc: ParsedDocument, fields=None):
+    """Fields of an already loaded document, through the extractor registry."""
+    import extractors
+    return extractors.run(pdoc, fields=fields)
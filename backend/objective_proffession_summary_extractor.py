@@ -1,21 +1,28 @@
 # objective_profession_summary_extractor.py
 import re
-from transformers import pipeline
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+import metrics
 
+from summarizers import get_summarizer
+
+@metrics.timed("extract_objective")
 def extract_objective(text: str):
     pattern = r"(Objective|Career Objective|Professional Summary)[:\- ]+(.*?)(?:\n\n|\Z)"
     m = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
     return m.group(2).strip() if m else None
 
+@metrics.timed("extract_profession")
 def extract_profession(text: str):
     pattern = r"\b(Engineer|Developer|Scientist|Manager|Consultant|Designer|Analyst|Specialist|Administrator|Coordinator)\b"
     m = re.search(pattern, text, re.IGNORECASE)
     return m.group(1).title() if m else None
 
-def extract_summary(text: str):
+@metrics.timed("extract_summary")
+def extract_summary(text: str, doc=None, backend=None):
+    # backend: "textrank", "bart", "bart-onnx", "none" (see summarizers.py)
+    summarizer = get_summarizer(backend)
+    if summarizer.name == "none":
+        return None
     if len(text) < 200:
         return text
-    result = summarizer(text[:1024], max_length=120, min_length=40, do_sample=False)
-    return result[0]["summary_text"]
+    return summarizer.summarize(text, doc)
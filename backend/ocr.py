@@ -0,0 +1,96 @@
+# ocr.py
+"""
+Page-parallel OCR for scanned PDFs.
+
+Pages are rasterised one at a time inside the worker that OCRs them, so at
+most `workers` page images exist at once instead of the whole document, and
+the pages of one PDF are recognised concurrently. Text comes back in page
+order.
+"""
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pytesseract
+from pdf2image import convert_from_bytes, convert_from_path, pdfinfo_from_bytes, pdfinfo_from_path
+
+import metrics
+
+OCR_DPI = int(os.environ.get("CV_PARSER_OCR_DPI", "300"))
+OCR_LANG = os.environ.get("CV_PARSER_OCR_LANG", "eng")
+# 0 = no limit; pages past the limit are not rasterised at all
+OCR_MAX_PAGES = int(os.environ.get("CV_PARSER_OCR_MAX_PAGES", "0"))
+# 1 = OCR serially in the calling process (e.g. inside batch workers)
+OCR_WORKERS = int(os.environ.get("CV_PARSER_OCR_WORKERS", "0")) or os.cpu_count() or 1
+
+# Point pytesseract to the installed tesseract.exe location
+if os.environ.get("TESSERACT_CMD"):
+    pytesseract.pytesseract.tesseract_cmd = os.environ["TESSERACT_CMD"]
+elif os.name == "nt":
+    pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # One tesseract thread per worker; the pool already uses every core
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_init_worker)
+        return _pool
+
+
+def page_count(path) -> int:
+    if isinstance(path, bytes):
+        return int(pdfinfo_from_bytes(path)["Pages"])
+    return int(pdfinfo_from_path(str(path))["Pages"])
+
+
+def ocr_page(path, page_no: int, dpi: int = OCR_DPI, lang: str = OCR_LANG) -> str:
+    """Rasterise and OCR a single 1-based page of a PDF given as a path or bytes."""
+    if isinstance(path, bytes):
+        images = convert_from_bytes(path, dpi=dpi, first_page=page_no, last_page=page_no)
+    else:
+        images = convert_from_path(str(path), dpi=dpi, first_page=page_no, last_page=page_no)
+    return pytesseract.image_to_string(images[0], lang=lang) if images else ""
+
+
+@metrics.timed("ocr")
+def ocr_pdf(path, pages=None, dpi: int = OCR_DPI, max_pages: int = OCR_MAX_PAGES,
+            lang: str = OCR_LANG, parallel=None):
+    """
+    OCR `pages` (1-based page numbers, default: all) of the PDF at `path`
+    (a path, or the PDF's bytes).
+    Returns one string per page, in the order given. Runs on the shared OCR
+    pool unless `parallel` is False or OCR_WORKERS is 1.
+
+    pdftoppm reads files, so PDF bytes are spooled to one temporary file
+    that every page (and worker) reads, instead of being pickled to each
+    worker and written out again per page.
+    """
+    if isinstance(path, (bytes, bytearray)):
+        fd, tmp = tempfile.mkstemp(suffix=".pdf", prefix="cv-ocr-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(path)
+            return ocr_pdf(tmp, pages, dpi, max_pages, lang, parallel)
+        finally:
+            os.unlink(tmp)
+    if parallel is None:
+        parallel = OCR_WORKERS > 1
+    if pages is None:
+        pages = range(1, page_count(path) + 1)
+    pages = list(pages)
+    if max_pages:
+        pages = pages[:max_pages]
+    if not parallel or len(pages) <= 1:
+        return [ocr_page(path, p, dpi, lang) for p in pages]
+    return list(_get_pool().map(ocr_page, repeat(str(path)), pages, repeat(dpi), repeat(lang)))
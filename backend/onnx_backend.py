@@ -0,0 +1,73 @@
+# onnx_backend.py
+"""
+ONNX Runtime variants of the transformers models.
+
+Models are exported once with optimum, their weights quantised to int8
+(dynamic quantisation) and the result kept under CV_PARSER_ONNX_DIR, so
+later processes load the quantised files directly.
+
+Needs the optional extras: pip install optimum[onnxruntime]
+(see requirements-optional.txt)
+"""
+import os
+import shutil
+from pathlib import Path
+
+ONNX_DIR = Path(os.environ.get("CV_PARSER_ONNX_DIR", "onnx_models"))
+# Threads per ONNX Runtime session (intra-op); 0 lets ONNX Runtime use every core.
+# With several gunicorn / batch workers per host, set it to cores / workers.
+ONNX_INTRA_OP_THREADS = int(os.environ.get("CV_PARSER_ONNX_THREADS", "0"))
+
+
+def session_options():
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return opts
+
+
+def _quantize_dir(src: Path, dst: Path):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    dst.mkdir(parents=True, exist_ok=True)
+    for f in src.iterdir():
+        if f.suffix == ".onnx":
+            quantize_dynamic(str(f), str(dst / f.name), weight_type=QuantType.QInt8)
+        elif f.is_file():
+            shutil.copy2(f, dst / f.name)
+
+
+def quantized_model_dir(model_id: str, ort_class) -> Path:
+    """Directory holding the int8 ONNX export of `model_id`, built on first use."""
+    out = ONNX_DIR / model_id.replace("/", "--") / "int8"
+    if not any(out.glob("*.onnx")):
+        fp32 = out.parent / "fp32"
+        if not any(fp32.glob("*.onnx")):
+            from transformers import AutoTokenizer
+
+            ort_class.from_pretrained(model_id, export=True).save_pretrained(fp32)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(fp32)
+        _quantize_dir(fp32, out)
+    return out
+
+
+def load_summarization_pipeline(model_id: str):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+
+    path = quantized_model_dir(model_id, ORTModelForSeq2SeqLM)
+    model = ORTModelForSeq2SeqLM.from_pretrained(path, session_options=session_options())
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(path))
+
+
+def load_token_classification_pipeline(model_id: str):
+    """int8 ONNX twin of pipeline("ner", model_id, aggregation_strategy="simple")."""
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from transformers import AutoTokenizer, pipeline
+
+    path = quantized_model_dir(model_id, ORTModelForTokenClassification)
+    model = ORTModelForTokenClassification.from_pretrained(path, session_options=session_options())
+    return pipeline("ner", model=model, tokenizer=AutoTokenizer.from_pretrained(path),
+                    aggregation_strategy="simple")
@@ -0,0 +1,80 @@
+# pipeline.py
+"""
+Full CV parse: the base fields (nlp_model) + every auxiliary extractor,
+merged into one record. Shared by the Flask app and the batch runner.
+The extractors and their inputs are listed in extractors.py, which also
+schedules them.
+"""
+import hashlib
+from pathlib import Path
+
+import extractors
+from nlp_model import _education_text, load_document
+
+
+def parse_document(pdoc, summarizer=None, fields=None):
+    """
+    `summarizer` picks the extract_summary backend ("none" skips it);
+    `fields` limits the output to those fields (see extractors.resolve_fields).
+    """
+    return extractors.run(pdoc, summarizer=summarizer, fields=fields)
+
+
+def stream_document(pdoc, summarizer=None, fields=None, errors=None):
+    """
+    Yield (field, value) as each extractor finishes; merge them with
+    extractors.merge() for the same record parse_document() returns.
+    Reason codes of failed fields go into `errors`.
+    """
+    return extractors.iter_run(pdoc, summarizer=summarizer, fields=fields, errors=errors)
+
+
+# Heavy fields computed from one section only; the others read the whole text
+REUSE_SECTIONS = {
+    "education": "education",   # edu_ner runs on the education section alone
+}
+
+
+def _hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def section_hashes(pdoc):
+    """Hashes of the texts the heavy extractors read, to compare near duplicates section by section."""
+    return {
+        "text": _hash(pdoc.raw_text),
+        "education": _hash(_education_text(pdoc.text_ascii)),
+    }
+
+
+def reuse_near_duplicate(pdoc, prior, prior_sections, summarizer=None):
+    """
+    Record for a CV that is a near duplicate of one parsed before (`prior`,
+    its full record; `prior_sections`, its section_hashes()). The cheap text
+    extractors run again, and so does every field that needs the spaCy Doc
+    or a model unless the section it reads has the same hash as before: only
+    those keep their prior values. Returns (parsed_data, changes, reused)
+    with changes = {field: {"old": ..., "new": ...}} for the recomputed
+    fields that differ from `prior` and `reused` the fields copied from it.
+    """
+    sections = section_hashes(pdoc)
+
+    def unchanged(field):
+        section = REUSE_SECTIONS.get(field, "text")
+        return sections[section] == prior_sections.get(section)
+
+    reused = [ex.field for ex in extractors.REGISTRY.values() if ex.heavy and ex.field in prior and unchanged(ex.field)]
+    errors = {}
+    fresh = dict(extractors.iter_run(
+        pdoc, summarizer=summarizer, fields=[f for f in extractors.REGISTRY if f not in reused], errors=errors))
+    results = {k: prior[k] for k in reused}
+    results.update(fresh)
+    changes = {
+        field: {"old": prior.get(field), "new": value}
+        for field, value in fresh.items() if prior.get(field) != value
+    }
+    return extractors.merge(pdoc, results, errors=errors), changes, reused
+
+
+def parse_file(file_path, summarizer=None, fields=None):
+    return parse_document(load_document(Path(file_path)), summarizer, fields)
@@ -0,0 +1,107 @@
+# result_cache.py
+"""
+On-disk cache of parse results keyed by the content of the uploaded file.
+
+Key = SHA-256 of the file bytes + the pipeline/model version string, so the
+same CV uploaded under any filename hits, while a new pipeline or model
+version never serves stale output. The cache is bounded: once it holds more
+than `max_entries` results the least recently used ones are deleted.
+
+Several processes (gunicorn workers) may share one directory. Each keeps its
+own LRU order, so `max_entries` is enforced per process: entries another
+process wrote count once this one has read them, and after a restart (the
+order is rebuilt from the directory). The directory can briefly hold up to
+`max_entries` per process.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import metrics
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory, version, max_entries: int = 10000):
+        # `version` is a string, or a callable returning the current one
+        self.directory = Path(directory)
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # key -> None, oldest first; rebuilt from file mtimes on start-up
+        self._lru = OrderedDict(
+            (p.stem, None)
+            for p in sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        )
+
+    def key(self, digest: str, variant: str = "") -> str:
+        # `variant` separates results of the same file under different options
+        version = self.version() if callable(self.version) else self.version
+        version_tag = hashlib.sha256(f"{version}|{variant}".encode("utf-8")).hexdigest()[:16]
+        return f"{digest}-{version_tag}"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, digest: str, variant: str = ""):
+        key = self.key(digest, variant)
+        path = self._path(key)
+        with self._lock:
+            # Another process sharing the directory may have written it
+            if key not in self._lru and not path.exists():
+                self.misses += 1
+                metrics.inc("cache_requests_total", result="miss")
+                return None
+            try:
+                result = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                # Entry vanished or is corrupt: treat as a miss and forget it
+                self._lru.pop(key, None)
+                self.misses += 1
+                metrics.inc("cache_requests_total", result="miss")
+                return None
+            # Written by another process: adopt it into this process's LRU order
+            self._lru[key] = None
+            self._lru.move_to_end(key)
+            self.hits += 1
+            metrics.inc("cache_requests_total", result="hit")
+        # Refresh mtime so the LRU order survives a restart
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, digest: str, result, variant: str = "") -> None:
+        key = self.key(digest, variant)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(result), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            self._lru[key] = None
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                old, _ = self._lru.popitem(last=False)
+                try:
+                    self._path(old).unlink()
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
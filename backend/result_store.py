@@ -0,0 +1,321 @@
+# result_store.py
+"""
+Append-only store of parse results in one SQLite file.
+
+Every finished parse becomes one row of the `results` table: the content
+hash, file name, pipeline version and every field of the merged
+parsed_data in a typed column (lists / dicts as JSON text). Appends are
+buffered and written in batches, one transaction per batch, instead of one
+small file per CV.
+
+Exports stream the table in chunks, so they never hold the whole store in
+memory:
+
+    python result_store.py export results.parquet     # or .arrow / .csv / .jsonl
+    python result_store.py import parsed_data/        # load old per-file JSON outputs
+
+Parquet / Arrow exports need the optional extra: pip install pyarrow
+(see requirements-optional.txt)
+"""
+import argparse
+import atexit
+import csv
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DB = os.environ.get("CV_PARSER_RESULTS_DB", "results.sqlite3")
+# Buffered rows are written once this many are waiting, or after this many seconds
+APPEND_BATCH_SIZE = int(os.environ.get("CV_PARSER_RESULTS_BATCH_SIZE", "100"))
+APPEND_FLUSH_SECONDS = float(os.environ.get("CV_PARSER_RESULTS_FLUSH_SECONDS", "2"))
+EXPORT_CHUNK_ROWS = 10000
+
+# parsed_data field -> column type; JSON columns hold lists / dicts / mixed values
+FIELDS = [
+    ("name", "TEXT"),
+    ("phone_number", "TEXT"),
+    ("email", "TEXT"),
+    ("designation", "TEXT"),
+    ("skills", "TEXT"),
+    ("nationality", "TEXT"),
+    ("education", "JSON"),
+    ("projects", "JSON"),
+    ("past_companies", "JSON"),
+    ("certifications", "JSON"),
+    ("date_of_birth", "TEXT"),
+    ("location", "TEXT"),
+    ("languages", "JSON"),
+    ("linkedin", "TEXT"),
+    ("websites", "JSON"),
+    ("is_resume_probability", "REAL"),
+    ("redacted_text", "JSON"),
+    ("objective", "TEXT"),
+    ("profession", "TEXT"),
+    ("summary", "TEXT"),
+    ("publications", "JSON"),
+    ("referees", "JSON"),
+    ("total_experience", "INTEGER"),
+    ("work_experience", "JSON"),
+    ("error", "TEXT"),
+]
+FIELD_TYPES = dict(FIELDS)
+# `field_order`: JSON list of the keys parsed_data had, so it reads back unchanged
+META_COLUMNS = ["id", "result_id", "filename", "pipeline_version", "created_at", "field_order"]
+# Fields not in FIELDS (new extractors) are kept here as JSON until they get a column
+EXTRA_COLUMN = "extra"
+COLUMNS = META_COLUMNS + [f for f, _ in FIELDS] + [EXTRA_COLUMN]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    result_id TEXT,
+    filename TEXT,
+    pipeline_version TEXT,
+    created_at REAL NOT NULL,
+    field_order TEXT,
+    {", ".join(f"{f} {'TEXT' if t == 'JSON' else t}" for f, t in FIELDS)},
+    {EXTRA_COLUMN} TEXT
+);
+CREATE INDEX IF NOT EXISTS results_result_id ON results (result_id, id);
+"""
+
+
+def _fits(kind, value):
+    if value is None or kind == "JSON":
+        return True
+    if kind == "TEXT":
+        return isinstance(value, str)
+    if kind == "INTEGER":
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_column(field, value):
+    if value is not None and FIELD_TYPES[field] == "JSON":
+        return json.dumps(value)
+    return value
+
+
+def _from_column(field, value):
+    if value is not None and FIELD_TYPES[field] == "JSON":
+        return json.loads(value)
+    return value
+
+
+def to_row(result_id, filename, pipeline_version, parsed_data, created_at=None):
+    row = [None, result_id, filename, pipeline_version, created_at or time.time(), json.dumps(list(parsed_data))]
+    # Values of an unexpected type (e.g. an error string in a number field) go to `extra`
+    extra = {k: v for k, v in parsed_data.items() if k not in FIELD_TYPES or not _fits(FIELD_TYPES[k], v)}
+    row += [None if f in extra else _to_column(f, parsed_data.get(f)) for f, _ in FIELDS]
+    row.append(json.dumps(extra) if extra else None)
+    return row
+
+
+def from_row(row):
+    """parsed_data of a stored row, with the keys it was stored with."""
+    extra = json.loads(row[EXTRA_COLUMN]) if row[EXTRA_COLUMN] else {}
+    return {
+        k: extra[k] if k in extra else _from_column(k, row[k])
+        for k in json.loads(row["field_order"])
+    }
+
+
+class ResultStore:
+    def __init__(self, db_path=RESULTS_DB, version=None, batch_size=APPEND_BATCH_SIZE,
+                 flush_seconds=APPEND_FLUSH_SECONDS):
+        # `version` is a string, or a callable returning the current one
+        self.db_path = str(db_path)
+        self.version = version
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher = None
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+        atexit.register(self.flush)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    # --- Appends ---
+    def append(self, result_id, parsed_data, filename=None):
+        """Queue one result; it is written with the next batch."""
+        version = self.version() if callable(self.version) else self.version
+        with self._lock:
+            self._pending.append(to_row(result_id, filename, version, parsed_data))
+            full = len(self._pending) >= self.batch_size
+            if self._flusher is None or self._flusher[0] != os.getpid():
+                thread = threading.Thread(target=self._flush_loop, name="result-store-flush", daemon=True)
+                self._flusher = (os.getpid(), thread)
+                thread.start()
+        if full:
+            self._wakeup.set()
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(timeout=self.flush_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning("Result store flush failed: %s", e)
+
+    def flush(self):
+        """Write every queued result in one transaction."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            db = None
+            began = False
+            try:
+                db = self._connect()
+                db.execute("BEGIN IMMEDIATE")
+                began = True
+                db.executemany(
+                    f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                if began:
+                    # A failed ROLLBACK must not hide the original error
+                    try:
+                        db.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        pass
+                with self._lock:
+                    # Keep them for the next attempt
+                    self._pending[:0] = rows
+                raise
+            finally:
+                if db is not None:
+                    db.close()
+            return len(rows)
+
+    # --- Reads ---
+    def latest(self, result_id, version=None):
+        """Most recent stored parsed_data for a content hash (optionally of one pipeline version)."""
+        sql = "SELECT * FROM results WHERE result_id = ?"
+        params = [result_id]
+        if version is not None:
+            sql += " AND pipeline_version = ?"
+            params.append(version)
+        with self._connect() as db:
+            row = db.execute(sql + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return from_row(row) if row is not None else None
+
+    def iter_rows(self, since_id=0, chunk_rows=EXPORT_CHUNK_ROWS):
+        """Raw rows in insertion order, fetched `chunk_rows` at a time."""
+        with self._connect() as db:
+            last = since_id
+            while True:
+                rows = db.execute(
+                    "SELECT * FROM results WHERE id > ? ORDER BY id LIMIT ?", (last, chunk_rows)
+                ).fetchall()
+                if not rows:
+                    return
+                yield rows
+                last = rows[-1]["id"]
+
+    def stats(self):
+        with self._connect() as db:
+            count = db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        with self._lock:
+            return {"rows": count, "pending": len(self._pending)}
+
+
+# --- Exports ---
+def _arrow_schema():
+    import pyarrow as pa
+    types = {"TEXT": pa.string(), "JSON": pa.string(), "REAL": pa.float64(), "INTEGER": pa.int64()}
+    return pa.schema(
+        [("id", pa.int64()), ("result_id", pa.string()), ("filename", pa.string()),
+         ("pipeline_version", pa.string()), ("created_at", pa.float64()), ("field_order", pa.string())]
+        + [(f, types[t]) for f, t in FIELDS]
+        + [(EXTRA_COLUMN, pa.string())]
+    )
+
+
+def export(store, out_path, fmt=None, since_id=0):
+    """Stream the store to Parquet / Arrow IPC / CSV / JSON Lines (by extension or `fmt`)."""
+    out_path = Path(out_path)
+    fmt = fmt or out_path.suffix.lstrip(".").lower()
+    count = 0
+    if fmt in ("parquet", "arrow", "feather"):
+        import pyarrow as pa
+        schema = _arrow_schema()
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(str(out_path), schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_file(str(out_path), schema)
+        try:
+            for rows in store.iter_rows(since_id):
+                columns = {name: [r[name] for r in rows] for name in COLUMNS}
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                count += len(rows)
+        finally:
+            writer.close()
+    elif fmt == "csv":
+        with open(out_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for rows in store.iter_rows(since_id):
+                writer.writerows([tuple(r) for r in rows])
+                count += len(rows)
+    elif fmt == "jsonl":
+        with open(out_path, "w", encoding="utf-8") as f:
+            for rows in store.iter_rows(since_id):
+                for r in rows:
+                    record = {k: r[k] for k in ("result_id", "filename", "pipeline_version", "created_at")}
+                    record["parsed_data"] = from_row(r)
+                    f.write(json.dumps(record) + "\n")
+                count += len(rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}. Use parquet, arrow, csv or jsonl")
+    return count
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export or load the parse result store.")
+    ap.add_argument("--db", default=RESULTS_DB)
+    sub = ap.add_subparsers(dest="command", required=True)
+    e = sub.add_parser("export")
+    e.add_argument("out", help="output file; the format follows the extension")
+    e.add_argument("--format", choices=["parquet", "arrow", "csv", "jsonl"])
+    e.add_argument("--since-id", type=int, default=0, help="only rows appended after this id")
+    i = sub.add_parser("import", help="append every <name>.json parse result in a directory")
+    i.add_argument("directory")
+    i.add_argument("--version", default="imported")
+    args = ap.parse_args(argv)
+
+    store = ResultStore(args.db, version=getattr(args, "version", None))
+    if args.command == "export":
+        n = export(store, args.out, args.format, args.since_id)
+        print(f"Exported {n} rows to {args.out}", file=sys.stderr)
+    else:
+        paths = sorted(Path(args.directory).glob("*.json"))
+        for path in paths:
+            # No content hash for these: the file name is the ID
+            store.append(path.stem, json.loads(path.read_text(encoding="utf-8")), filename=path.name)
+        store.flush()
+        print(f"Imported {len(paths)} results into {args.db}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
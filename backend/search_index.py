@@ -0,0 +1,260 @@
+# search_index.py
+"""
+Candidate search over parsed results, kept in one SQLite file.
+
+    candidates       one row per parsed CV (result_id = content hash)
+    candidate_terms  exact-match facets: skill, company, language
+    candidates_fts   FTS5 index over name, designation, skills, companies,
+                     location and the CV text, ranked with bm25
+
+Results are added one at a time as parses finish (`add`), so the index is
+always current without rebuilds. Filters are served from B-tree indexes and
+free text from the FTS index, so a query touches only matching rows.
+
+    python search_index.py add parsed_data/             # backfill from JSON files
+    python search_index.py query "data engineer" --skill kubernetes --min-experience 5
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+SEARCH_DB = os.environ.get("CV_PARSER_SEARCH_DB", "search.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    result_id TEXT PRIMARY KEY,
+    filename TEXT,
+    name TEXT,
+    designation TEXT,
+    location TEXT,
+    total_experience INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_experience ON candidates (total_experience);
+CREATE TABLE IF NOT EXISTS candidate_terms (
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL,
+    result_id TEXT NOT NULL,
+    PRIMARY KEY (kind, term, result_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS candidate_terms_result ON candidate_terms (result_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+    name, designation, skills, companies, location, body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+# bm25 column weights, in candidates_fts column order
+FTS_WEIGHTS = (2.0, 3.0, 4.0, 2.0, 1.0, 1.0)
+# Parsed fields whose text goes into `body` when the CV text is not given
+BODY_FIELDS = ("summary", "objective", "profession", "work_experience", "projects", "education", "certifications")
+MAX_LIMIT = 200
+
+_TOKEN_REGEX = re.compile(r"\w[\w+#.]*", re.UNICODE)
+
+
+def normalise(term) -> str:
+    return " ".join(str(term).split()).lower()
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        # e.g. skills is "a; b; c"
+        return [v for v in (s.strip() for s in value.split(";")) if v]
+    return [v for v in value if v]
+
+
+def _flatten(value):
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return [s for v in value.values() for s in _flatten(v)]
+    if isinstance(value, (list, tuple)):
+        return [s for v in value for s in _flatten(v)]
+    return [str(value)]
+
+
+def _fts_phrase(text: str) -> str:
+    """`text` as an FTS5 query of quoted tokens (all must match); no user syntax."""
+    return " ".join('"' + t.replace('"', '""') + '"' for t in _TOKEN_REGEX.findall(text))
+
+
+class SearchIndex:
+    def __init__(self, db_path=SEARCH_DB):
+        self.db_path = str(db_path)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    # --- Updates ---
+    def add(self, result_id, parsed_data, text=None, filename=None):
+        """Index (or re-index) one parse result. `text` is the CV text, if at hand."""
+        skills = _as_list(parsed_data.get("skills"))
+        companies = _as_list(parsed_data.get("past_companies"))
+        languages = _as_list(parsed_data.get("languages"))
+        experience = parsed_data.get("total_experience")
+        body = text if text is not None else "\n".join(s for f in BODY_FIELDS for s in _flatten(parsed_data.get(f)))
+        row = (
+            filename, parsed_data.get("name"), parsed_data.get("designation"), parsed_data.get("location"),
+            int(experience) if isinstance(experience, (int, float)) else None, time.time(),
+        )
+        terms = (
+            [("skill", normalise(s)) for s in skills]
+            + [("company", normalise(c)) for c in companies]
+            + [("language", normalise(l)) for l in languages]
+        )
+
+        db = self._connect()
+        began = False
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            began = True
+            old = db.execute("SELECT rowid FROM candidates WHERE result_id = ?", (result_id,)).fetchone()
+            if old is None:
+                rowid = db.execute(
+                    "INSERT INTO candidates (result_id, filename, name, designation, location, total_experience, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", (result_id,) + row,
+                ).lastrowid
+            else:
+                rowid = old["rowid"]
+                db.execute(
+                    "UPDATE candidates SET filename = ?, name = ?, designation = ?, location = ?, "
+                    "total_experience = ?, indexed_at = ? WHERE rowid = ?", row + (rowid,),
+                )
+                db.execute("DELETE FROM candidates_fts WHERE rowid = ?", (rowid,))
+                db.execute("DELETE FROM candidate_terms WHERE result_id = ?", (result_id,))
+            db.execute(
+                "INSERT INTO candidates_fts (rowid, name, designation, skills, companies, location, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rowid, row[1] or "", row[2] or "", "\n".join(skills), "\n".join(companies), row[3] or "", body),
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO candidate_terms (kind, term, result_id) VALUES (?, ?, ?)",
+                [(kind, term, result_id) for kind, term in terms if term],
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            if began:
+                # A failed ROLLBACK must not hide the original error
+                try:
+                    db.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            raise
+        finally:
+            db.close()
+
+    def remove(self, result_id):
+        with self._connect() as db:
+            old = db.execute("SELECT rowid FROM candidates WHERE result_id = ?", (result_id,)).fetchone()
+            if old is not None:
+                db.execute("DELETE FROM candidates_fts WHERE rowid = ?", (old["rowid"],))
+                db.execute("DELETE FROM candidate_terms WHERE result_id = ?", (result_id,))
+                db.execute("DELETE FROM candidates WHERE rowid = ?", (old["rowid"],))
+
+    # --- Queries ---
+    def search(self, q=None, skills=(), companies=(), languages=(), location=None, designation=None,
+               min_experience=None, max_experience=None, limit=20, offset=0):
+        """
+        Candidates matching every filter (all listed skills / companies /
+        languages, location and designation words, experience range), ranked
+        by bm25 against `q` when given, else newest first.
+        """
+        where, params = [], []
+        match = []
+        if q and _fts_phrase(q):
+            match.append(_fts_phrase(q))
+        if location and _fts_phrase(location):
+            match.append(f"location : ({_fts_phrase(location)})")
+        if designation and _fts_phrase(designation):
+            match.append(f"designation : ({_fts_phrase(designation)})")
+        for kind, values in (("skill", skills), ("company", companies), ("language", languages)):
+            for value in values:
+                where.append("c.result_id IN (SELECT result_id FROM candidate_terms WHERE kind = ? AND term = ?)")
+                params += [kind, normalise(value)]
+        if min_experience is not None:
+            where.append("c.total_experience >= ?")
+            params.append(min_experience)
+        if max_experience is not None:
+            where.append("c.total_experience <= ?")
+            params.append(max_experience)
+
+        if match:
+            weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+            sql = (f"SELECT c.*, bm25(candidates_fts, {weights}) AS score FROM candidates_fts "
+                   "JOIN candidates c ON c.rowid = candidates_fts.rowid WHERE candidates_fts MATCH ?")
+            params.insert(0, " AND ".join(match))
+            order = "score"
+        else:
+            sql = "SELECT c.*, NULL AS score FROM candidates c WHERE 1"
+            order = "c.indexed_at DESC"
+        for clause in where:
+            sql += f" AND {clause}"
+        sql += f" ORDER BY {order} LIMIT ? OFFSET ?"
+        params += [max(1, min(int(limit), MAX_LIMIT)), max(0, int(offset))]
+
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        return [
+            {
+                "result_id": r["result_id"],
+                "filename": r["filename"],
+                "name": r["name"],
+                "designation": r["designation"],
+                "location": r["location"],
+                "total_experience": r["total_experience"],
+                # bm25 is lower-is-better; report higher-is-better
+                "score": round(-r["score"], 4) if r["score"] is not None else None,
+            }
+            for r in rows
+        ]
+
+    def stats(self):
+        with self._connect() as db:
+            return {"candidates": db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Candidate search index.")
+    ap.add_argument("--db", default=SEARCH_DB)
+    sub = ap.add_subparsers(dest="command", required=True)
+    a = sub.add_parser("add", help="index every <name>.json parse result in a directory")
+    a.add_argument("directory")
+    s = sub.add_parser("query")
+    s.add_argument("q", nargs="?")
+    s.add_argument("--skill", action="append", default=[])
+    s.add_argument("--company", action="append", default=[])
+    s.add_argument("--language", action="append", default=[])
+    s.add_argument("--location")
+    s.add_argument("--designation")
+    s.add_argument("--min-experience", type=int)
+    s.add_argument("--limit", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    index = SearchIndex(args.db)
+    if args.command == "add":
+        paths = sorted(Path(args.directory).glob("*.json"))
+        for path in paths:
+            # No content hash for these: the file name is the ID
+            index.add(path.stem, json.loads(path.read_text(encoding="utf-8")), filename=path.name)
+        print(f"Indexed {len(paths)} results into {args.db}", file=sys.stderr)
+    else:
+        hits = index.search(args.q, args.skill, args.company, args.language, args.location,
+                            args.designation, args.min_experience, limit=args.limit)
+        print(json.dumps(hits, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
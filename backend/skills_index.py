@@ -0,0 +1,207 @@
+# skills_index.py
+"""
+Prebuilt skills index.
+
+The plain-text vocabulary (one skill per line) is compiled once into a
+small versioned JSON index mapping each skill's normalised token sequence
+to a canonical skill ID and display name:
+
+    python skills_index.py build [skills.txt] [-o skills.index.json]
+
+Workers load the index in milliseconds instead of tokenising the whole
+vocabulary into a PhraseMatcher at boot. Different spellings of one skill
+("API" / "api", "python" / "Python") resolve to the same canonical entry.
+The index file is re-read automatically when it changes on disk.
+
+Requests never build the index: without an index file, current() returns
+an empty one (no skills found) and logs how to build it. Model preloading
+(load(), e.g. gunicorn's when_ready) builds it from the vocabulary
+(CV_PARSER_SKILLS_FILE, default skills.txt next to this module) if that
+exists.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+from unidecode import unidecode
+
+INDEX_FORMAT = 1
+SKILLS_FILE = Path(os.environ.get("CV_PARSER_SKILLS_FILE", Path(__file__).with_name("skills.txt")))
+SKILLS_INDEX = Path(os.environ.get("CV_PARSER_SKILLS_INDEX", "skills.index.json"))
+# How often (seconds) the index file is checked for changes
+RELOAD_CHECK_INTERVAL = float(os.environ.get("CV_PARSER_SKILLS_RELOAD_INTERVAL", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+def _tokenizer():
+    # Same English tokenizer rules as en_core_web_md, without loading the model
+    import spacy
+    return spacy.blank("en").tokenizer
+
+
+def skill_id(tokens) -> str:
+    return " ".join(t.lower() for t in tokens)
+
+
+def build_index(vocab_path: Path = SKILLS_FILE, out_path: Path = SKILLS_INDEX) -> Path:
+    raw = Path(vocab_path).read_bytes()
+    tokenizer = _tokenizer()
+    skills = {}
+    max_tokens = 0
+    for line in raw.decode("utf-8", errors="ignore").splitlines():
+        surface = unidecode(line.strip())
+        if not surface:
+            continue
+        tokens = [t.text for t in tokenizer(surface)]
+        sid = skill_id(tokens)
+        # First spelling in the vocabulary becomes the canonical display name
+        if sid not in skills:
+            skills[sid] = surface
+            max_tokens = max(max_tokens, len(tokens))
+    index = {
+        "format": INDEX_FORMAT,
+        "vocab_sha256": hashlib.sha256(raw).hexdigest(),
+        "built_at": time.time(),
+        "max_tokens": max_tokens,
+        "skills": skills,
+    }
+    out_path = Path(out_path)
+    tmp = out_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index), encoding="utf-8")
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class SkillsIndex:
+    def __init__(self, path: Path = None):
+        # No path: an empty index, used until an index file exists
+        if path is None:
+            self.path = self.mtime = None
+            self.version = "none"
+            self.max_tokens = 0
+            self.skills = {}
+            return
+        self.path = Path(path)
+        self.mtime = self.path.stat().st_mtime
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("format") != INDEX_FORMAT:
+            raise ValueError(f"{path}: unsupported skills index format {data.get('format')}")
+        self.version = data["vocab_sha256"][:16]
+        self.max_tokens = data["max_tokens"]
+        self.skills = data["skills"]
+
+    def __len__(self):
+        return len(self.skills)
+
+    def match(self, doc):
+        """
+        Canonical skill IDs found in `doc` (any token sequence whose lowercase
+        forms equal a skill's, overlapping matches included).
+        """
+        lowers = [t.lower_ for t in doc]
+        found = set()
+        for i in range(len(lowers)):
+            for n in range(1, min(self.max_tokens, len(lowers) - i) + 1):
+                sid = " ".join(lowers[i:i + n])
+                if sid in self.skills:
+                    found.add(sid)
+        return found
+
+    def names(self, skill_ids):
+        return sorted(self.skills[s] for s in skill_ids)
+
+
+_current = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+def current() -> SkillsIndex:
+    """
+    The loaded index, reloaded when the file on disk has changed (checked at
+    most every RELOAD_CHECK_INTERVAL seconds). An empty index while no index
+    file exists.
+    """
+    global _current, _last_check
+    now = time.monotonic()
+    if _current is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return _current
+    with _lock:
+        _last_check = now
+        if not SKILLS_INDEX.exists():
+            if _current is None:
+                logger.warning("No skills index at %s: no skills will be found. Build it with "
+                               "`python skills_index.py build <skills.txt>`", SKILLS_INDEX)
+                _current = SkillsIndex()
+        elif _current is None or SKILLS_INDEX.stat().st_mtime != _current.mtime:
+            _current = SkillsIndex(SKILLS_INDEX)
+    return _current
+
+
+_VERSION_REGEX = re.compile(rb'"vocab_sha256":\s*"([0-9a-f]{16})')
+# (index file mtime, its version), so version() reads the file once per change
+_version = (None, "none")
+
+
+def version() -> str:
+    """
+    Version of the index on disk, without loading it: read from the start of
+    the index file (build_index writes it first). "none" without an index.
+    """
+    global _version
+    try:
+        mtime = SKILLS_INDEX.stat().st_mtime
+    except FileNotFoundError:
+        return "none"
+    if _version[0] != mtime:
+        with open(SKILLS_INDEX, "rb") as f:
+            m = _VERSION_REGEX.search(f.read(4096))
+        _version = (mtime, m.group(1).decode() if m else SkillsIndex(SKILLS_INDEX).version)
+    return _version[1]
+
+
+def load() -> SkillsIndex:
+    """current(), after building the index from SKILLS_FILE if there is none (startup only)."""
+    if not SKILLS_INDEX.exists() and SKILLS_FILE.exists():
+        with _lock:
+            build_index(SKILLS_FILE, SKILLS_INDEX)
+        return reload()
+    return current()
+
+
+def reload() -> SkillsIndex:
+    """Force a re-read of the index file."""
+    global _current
+    with _lock:
+        _current = SkillsIndex(SKILLS_INDEX)
+    return _current
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the skills index from a vocabulary file.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("vocab", nargs="?", default=str(SKILLS_FILE))
+    b.add_argument("-o", "--out", default=str(SKILLS_INDEX))
+    args = ap.parse_args(argv)
+
+    if not Path(args.vocab).is_file():
+        print(f"No skills vocabulary at {args.vocab} (one skill per line; see CV_PARSER_SKILLS_FILE)",
+              file=sys.stderr)
+        return 1
+    out = build_index(Path(args.vocab), Path(args.out))
+    index = SkillsIndex(out)
+    print(f"Wrote {out}: {len(index)} skills, version {index.version}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
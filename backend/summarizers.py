@@ -0,0 +1,101 @@
+# summarizers.py
+"""
+Summarisation backends for extract_summary.
+
+    textrank   extractive: ranks sentences with TextRank over spaCy vectors
+    bart       facebook/bart-large-cnn through transformers (the original)
+    bart-onnx  the same model exported to ONNX with int8 weights
+    none       no summary
+
+The deployment default comes from CV_PARSER_SUMMARIZER; callers can pick
+another backend per call.
+"""
+import os
+
+import models
+
+DEFAULT_SUMMARIZER = os.environ.get("CV_PARSER_SUMMARIZER", "bart")
+TEXTRANK_SENTENCES = int(os.environ.get("CV_PARSER_TEXTRANK_SENTENCES", "3"))
+
+
+class Summarizer:
+    name = None
+
+    def summarize(self, text: str, doc=None) -> str:
+        raise NotImplementedError
+
+
+class TextRankSummarizer(Summarizer):
+    """
+    Builds a graph of sentences weighted by the cosine similarity of their
+    spaCy vectors, runs PageRank on it and returns the top sentences in
+    document order. Needs no model beyond the shared spaCy pipeline.
+    """
+    name = "textrank"
+
+    def __init__(self, n_sentences=TEXTRANK_SENTENCES, damping=0.85, iterations=30):
+        self.n_sentences = n_sentences
+        self.damping = damping
+        self.iterations = iterations
+
+    def summarize(self, text, doc=None):
+        import numpy as np
+
+        if doc is None:
+            doc = models.spacy_doc(text, ["sents"])
+        sents = [s for s in doc.sents if len(s.text.split()) >= 4 and s.vector_norm]
+        if len(sents) <= self.n_sentences:
+            return " ".join(s.text.strip() for s in sents) or text.strip()
+
+        vectors = np.array([s.vector / s.vector_norm for s in sents])
+        sim = np.clip(vectors @ vectors.T, 0.0, None)
+        np.fill_diagonal(sim, 0.0)
+        row_sums = sim.sum(axis=1, keepdims=True)
+        row_sums[row_sums == 0] = 1.0
+        transition = sim / row_sums
+
+        n = len(sents)
+        scores = np.full(n, 1.0 / n)
+        for _ in range(self.iterations):
+            scores = (1 - self.damping) / n + self.damping * transition.T @ scores
+
+        top = sorted(np.argsort(-scores)[: self.n_sentences])
+        return " ".join(sents[i].text.strip() for i in top)
+
+
+class BartSummarizer(Summarizer):
+    name = "bart"
+    model_name = "summarizer"
+
+    def summarize(self, text, doc=None):
+        result = models.get(self.model_name)(text[:1024], max_length=120, min_length=40, do_sample=False)
+        return result[0]["summary_text"]
+
+
+class OnnxBartSummarizer(BartSummarizer):
+    """BART through ONNX Runtime with dynamically quantised int8 weights."""
+    name = "bart-onnx"
+    model_name = "summarizer_onnx"
+
+
+class NoSummarizer(Summarizer):
+    name = "none"
+
+    def summarize(self, text, doc=None):
+        return None
+
+
+SUMMARIZERS = {
+    cls.name: cls
+    for cls in (TextRankSummarizer, BartSummarizer, OnnxBartSummarizer, NoSummarizer)
+}
+_instances = {}
+
+
+def get_summarizer(name=None) -> Summarizer:
+    name = name or DEFAULT_SUMMARIZER
+    if name not in SUMMARIZERS:
+        raise ValueError(f"Unknown summarizer '{name}'. Choose from: {', '.join(SUMMARIZERS)}")
+    if name not in _instances:
+        _instances[name] = SUMMARIZERS[name]()
+    return _instances[name]
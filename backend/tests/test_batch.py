@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import batch
+
+
+def test_iter_parse_reads_items_as_groups_finish(monkeypatch):
+    monkeypatch.setattr(batch, "parse_group", lambda group: [{"file": name} for name, _ in group])
+    read = []
+
+    def items():
+        for n in range(10):
+            read.append(n)
+            yield (f"{n}.txt", b"cv")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        results = batch.iter_parse(items(), pool, group_size=2, max_pending=2)
+        first = next(results)
+        # Two groups submitted ahead, the rest not read yet
+        assert len(read) == 4
+        rest = list(results)
+    assert sorted(r["file"] for _, r in [first] + rest) == sorted(f"{n}.txt" for n in range(10))
+    assert all(item[0] == result["file"] for item, result in [first] + rest)
@@ -0,0 +1,103 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+pytest.importorskip("flask")
+
+MB = 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    # app.py opens its stores on import: keep them out of the working directory
+    root = tmp_path_factory.mktemp("app")
+    with pytest.MonkeyPatch.context() as mp:
+        for var, name in [("CV_PARSER_CACHE_DIR", "cache"), ("CV_PARSER_JOBS_DB", "jobs.sqlite3"),
+                          ("CV_PARSER_JOBS_SPOOL_DIR", "job_spool"), ("CV_PARSER_RESULTS_DB", "results.sqlite3"),
+                          ("CV_PARSER_SEARCH_DB", "search.sqlite3"), ("CV_PARSER_ARTIFACTS_DB", "artifacts.sqlite3"),
+                          ("CV_PARSER_NEAR_DUP_DB", "near.sqlite3")]:
+            mp.setenv(var, str(root / name))
+        yield pytest.importorskip("app")
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    parsed = []
+
+    def iter_parse(items):
+        for item in items:
+            filename, data = item
+            parsed.append(filename)
+            yield item, {"file": filename, "parsed_data": {"size": len(data)}}
+
+    monkeypatch.setattr(app_module.batch, "iter_parse", iter_parse)
+    monkeypatch.setattr(app_module, "store_result", lambda *args, **kwargs: None)
+    monkeypatch.setattr(app_module.result_cache, "get", lambda digest: None)
+    client = app_module.app.test_client()
+    client.parsed = parsed
+    return client
+
+
+def make_zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    buf.seek(0)
+    return buf
+
+
+def post(client, *files):
+    return client.post("/api/parse-cv/batch", data={"files": list(files)}, content_type="multipart/form-data")
+
+
+def test_zip_members_are_parsed(client):
+    resp = post(client, (make_zip({"a.txt": b"a" * 10, "b.txt": b"b" * 20, "skip.exe": b"x"}), "cvs.zip"))
+    assert resp.status_code == 200
+    results = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert sorted((r["file"], r["parsed_data"]["size"]) for r in results) == [("a.txt", 10), ("b.txt", 20)]
+
+
+def test_too_many_files_is_413(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_BATCH_FILES", 3)
+    resp = post(client, (make_zip({f"{n}.txt": b"cv" for n in range(4)}), "cvs.zip"))
+    assert resp.status_code == 413
+    assert "3 files" in resp.get_json()["error"]
+    assert client.parsed == []
+
+
+def test_unsupported_members_count_towards_the_file_cap(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_BATCH_FILES", 3)
+    resp = post(client, (make_zip({f"{n}.bin": b"" for n in range(4)}), "junk.zip"))
+    assert resp.status_code == 413
+
+
+def test_zip_bomb_is_413_before_decompressing(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_BATCH_UPLOAD_MB", 1)
+    # ~1.5 MB of text that compresses to a few KB
+    bomb = make_zip({"a.txt": b"0" * (MB * 3 // 4), "b.txt": b"0" * (MB * 3 // 4)})
+    assert len(bomb.getvalue()) < 50 * 1024
+    resp = post(client, (bomb, "cvs.zip"))
+    assert resp.status_code == 413
+    assert client.parsed == []
+
+
+def test_total_includes_plain_files(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_BATCH_UPLOAD_MB", 1)
+    resp = post(client, (make_zip({"a.txt": b"0" * (MB * 3 // 4)}), "cvs.zip"),
+                (io.BytesIO(b"1" * (MB * 3 // 4)), "b.txt"))
+    assert resp.status_code == 413
+
+
+def test_member_over_the_single_file_limit_is_skipped(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_UPLOAD_MB", 0.5)
+    resp = post(client, (make_zip({"big.txt": b"0" * (MB * 3 // 4), "small.txt": b"cv"}), "cvs.zip"))
+    assert resp.status_code == 200
+    assert client.parsed == ["small.txt"]
+
+
+def test_invalid_zip_is_400(client):
+    resp = post(client, (io.BytesIO(b"not a zip"), "cvs.zip"))
+    assert resp.status_code == 400
@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+extractors = pytest.importorskip("extractors")
+
+PDOC = SimpleNamespace(raw_text="cv", text_ascii="cv", lines=["cv"], is_empty=False)
+
+
+@pytest.fixture
+def release():
+    """Set at teardown, so tasks blocked on it do not outlive the test."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(extractors, "EXTRACTOR_TIMEOUT", 0)
+    monkeypatch.setattr(extractors, "EXTRACTOR_TIMEOUTS", {})
+    monkeypatch.setattr(extractors, "PARSE_TIMEOUT", 0)
+    monkeypatch.setattr(extractors, "PROVIDERS", {})
+    monkeypatch.setattr(extractors, "REGISTRY", {})
+
+    def add(field, fn):
+        extractors.REGISTRY[field] = extractors.Extractor(field, lambda raw_text: fn(), ["raw_text"], False)
+    return add
+
+
+def test_budget_counts_time_in_the_queue(registry, monkeypatch):
+    monkeypatch.setattr(extractors, "EXTRACTOR_TIMEOUT", 0.4)
+    registry("first", lambda: time.sleep(0.3) or "a")
+    registry("second", lambda: time.sleep(0.3) or "b")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        result = extractors.run(PDOC, pool=pool)
+    # The second task only starts after 0.3 s in the queue and would end at 0.6 s
+    assert result == {"first": "a", "second": None, "field_errors": {"second": "timeout"}}
+
+
+def test_document_deadline_stops_waiting(registry, monkeypatch, release):
+    monkeypatch.setattr(extractors, "PARSE_TIMEOUT", 0.3)
+    registry("stuck", lambda: release.wait(5))
+    registry("quick", lambda: "q")
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = extractors.run(PDOC, pool=pool)
+        release.set()
+    assert time.monotonic() - started < 2
+    assert result == {"stuck": None, "quick": "q", "field_errors": {"stuck": "timeout"}}
+
+
+def test_pool_is_replaced_once_abandoned_tasks_hold_half_its_threads(registry, monkeypatch, release):
+    monkeypatch.setattr(extractors, "EXTRACTOR_WORKERS", 2)
+    monkeypatch.setattr(extractors, "EXTRACTOR_TIMEOUT", 0.2)
+    monkeypatch.setattr(extractors, "_pool", None)
+    monkeypatch.setattr(extractors, "_abandoned", set())
+    registry("stuck", lambda: release.wait(5))
+    pool = extractors.get_pool()
+    result = extractors.run(PDOC)
+    assert result["field_errors"] == {"stuck": "timeout"}
+    assert extractors.get_pool() is not pool
+    release.set()
+    pool.shutdown()
+
+
+def test_serial_mode_off_the_main_thread_keeps_budgets(registry, monkeypatch, release):
+    monkeypatch.setattr(extractors, "EXTRACTOR_WORKERS", 1)
+    monkeypatch.setattr(extractors, "_pool", None)
+    monkeypatch.setattr(extractors, "EXTRACTOR_TIMEOUT", 0.2)
+    registry("stuck", lambda: release.wait(5))
+    out = {}
+    thread = threading.Thread(target=lambda: out.update(extractors.run(PDOC)))
+    thread.start()
+    thread.join(2)
+    assert out == {"stuck": None, "field_errors": {"stuck": "timeout"}}
+
+
+@pytest.mark.skipif(not hasattr(__import__("signal"), "setitimer"), reason="needs SIGALRM")
+def test_serial_mode_in_the_main_thread_interrupts(registry, monkeypatch):
+    monkeypatch.setattr(extractors, "EXTRACTOR_WORKERS", 1)
+    monkeypatch.setattr(extractors, "_pool", None)
+    monkeypatch.setattr(extractors, "EXTRACTOR_TIMEOUT", 0.2)
+    registry("slow", lambda: time.sleep(5))
+    started = time.monotonic()
+    assert extractors.run(PDOC)["field_errors"] == {"slow": "timeout"}
+    assert time.monotonic() - started < 2
+
+
+def test_failed_extractor_is_logged(registry, caplog):
+    def boom():
+        raise ValueError("bad input")
+    registry("broken", boom)
+    with caplog.at_level(logging.WARNING, logger="extractors"):
+        result = extractors.run(PDOC, pool=None)
+    assert result["field_errors"] == {"broken": "error"}
+    assert "Extractor broken failed" in caplog.text
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+import batch
+from jobs import JobQueue, QueueFull
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(batch, "get_pool", lambda: executor)
+    yield executor
+    executor.shutdown()
+
+
+def make_queue(tmp_path, **kwargs):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", tmp_path / "spool", **kwargs)
+    # Run jobs synchronously in the test instead of on worker threads
+    queue._pid = os.getpid()
+    return queue
+
+
+def run_next(queue):
+    db = queue._connect()
+    try:
+        job = queue._claim(db)
+        queue._run(db, job)
+        return job
+    finally:
+        db.close()
+
+
+def test_done_job_calls_on_done_and_removes_spool(tmp_path, pool, monkeypatch):
+    monkeypatch.setattr(batch, "parse_one", lambda path: {"file": Path(path).name, "parsed_data": {"name": "A"}})
+    done = []
+    queue = make_queue(tmp_path, on_done=lambda digest, data: done.append((digest, data)))
+    job_id = queue.submit("cv.txt", b"hello", digest="d1")
+    job = run_next(queue)
+    assert queue.get(job_id)["status"] == "done"
+    assert queue.get(job_id)["parsed_data"] == {"name": "A"}
+    assert done == [("d1", {"name": "A"})]
+    assert not Path(job["path"]).parent.exists()
+
+
+def test_failed_parse_marks_job_failed(tmp_path, pool, monkeypatch):
+    def boom(path):
+        raise RuntimeError("worker died")
+    monkeypatch.setattr(batch, "parse_one", boom)
+    queue = make_queue(tmp_path)
+    job_id = queue.submit("cv.txt", b"hello")
+    job = run_next(queue)
+    assert queue.get(job_id)["status"] == "failed"
+    assert "worker died" in queue.get(job_id)["error"]
+    assert not Path(job["path"]).parent.exists()
+
+
+def test_on_done_error_does_not_kill_worker(tmp_path, pool, monkeypatch):
+    monkeypatch.setattr(batch, "parse_one", lambda path: {"parsed_data": {"name": "A"}})
+
+    def on_done(digest, data):
+        raise sqlite3.OperationalError("database is locked")
+    queue = make_queue(tmp_path, on_done=on_done)
+    first = queue.submit("a.txt", b"a", digest="d1")
+    second = queue.submit("b.txt", b"b", digest="d2")
+    run_next(queue)
+    run_next(queue)
+    assert queue.get(first)["status"] == "done"
+    assert queue.get(second)["status"] == "done"
+
+
+def test_status_update_error_marks_job_failed(tmp_path, pool, monkeypatch):
+    monkeypatch.setattr(batch, "parse_one", lambda path: {"parsed_data": {"name": "A"}})
+    queue = make_queue(tmp_path)
+    job_id = queue.submit("cv.txt", b"hello")
+
+    class FlakyDb:
+        def __init__(self, db):
+            self.db = db
+
+        def execute(self, sql, *args):
+            if "status = 'done'" in sql:
+                raise sqlite3.OperationalError("disk I/O error")
+            return self.db.execute(sql, *args)
+
+    db = queue._connect()
+    job = queue._claim(db)
+    queue._run(FlakyDb(db), job)
+    db.close()
+    assert queue.get(job_id)["status"] == "failed"
+    assert not Path(job["path"]).parent.exists()
+
+
+def test_broken_pool_is_replaced_for_the_next_job(tmp_path, monkeypatch):
+    class BrokenPool:
+        shut_down = False
+
+        def submit(self, fn, *args):
+            raise BrokenProcessPool("A child process terminated abruptly")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut_down = True
+
+    broken = BrokenPool()
+    monkeypatch.setattr(batch, "_pool", broken)
+    # The replacement pool runs in this process
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", lambda **kwargs: ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(batch, "parse_one", lambda path: {"parsed_data": {"name": "A"}})
+    queue = make_queue(tmp_path)
+    first = queue.submit("a.txt", b"a")
+    second = queue.submit("b.txt", b"b")
+    run_next(queue)
+    assert queue.get(first)["status"] == "failed"
+    assert "terminated abruptly" in queue.get(first)["error"]
+    assert broken.shut_down
+    run_next(queue)
+    assert queue.get(second)["status"] == "done"
+    batch._pool.shutdown()
+
+
+def test_queue_full(tmp_path):
+    queue = make_queue(tmp_path, max_depth=1)
+    queue.submit("a.txt", b"a")
+    with pytest.raises(QueueFull):
+        queue.submit("b.txt", b"b")
@@ -0,0 +1,97 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from near_duplicates import NearDuplicateIndex, signature, similarity
+
+CV = "\n".join([
+    "Jane Doe",
+    "Senior data engineer with ten years of experience building batch and streaming pipelines",
+    "Phone +1 555 0100 email jane@example.com",
+    "Education",
+    "Massachusetts Institute of Technology BSc Computer Science GPA 3.8",
+    "Experience",
+    "Acme Inc data engineer 2015 - 2020 built the billing warehouse and reporting jobs",
+    "Globex Ltd senior engineer 2020 - present leads the ingestion platform team",
+])
+EDITED = CV.replace("+1 555 0100", "+1 555 0199")
+OTHER = "\n".join([
+    "John Smith",
+    "Pastry chef and restaurant owner, twenty years in French and Italian kitchens",
+    "Le Cordon Bleu Paris diploma in patisserie",
+])
+
+
+def test_signature_similarity():
+    assert signature("") is None
+    assert similarity(signature(CV), signature(CV)) == 1.0
+    assert similarity(signature(CV), signature(EDITED)) > 0.7
+    assert similarity(signature(CV), signature(OTHER)) < 0.2
+
+
+def test_find_returns_best_match_above_threshold(tmp_path):
+    index = NearDuplicateIndex(tmp_path / "near.sqlite3", threshold=0.7)
+    index.add("cv", signature(CV), "cv.pdf")
+    index.add("other", signature(OTHER), "other.pdf")
+    result_id, score = index.find(signature(EDITED))
+    assert result_id == "cv" and 0.7 <= score < 1.0
+    assert index.find(signature(CV), exclude="cv") is None
+    assert index.find(None) is None
+    assert index.stats() == {"signatures": 2}
+
+
+def test_sections_are_stored_with_the_signature(tmp_path):
+    index = NearDuplicateIndex(tmp_path / "near.sqlite3")
+    index.add("cv", signature(CV), sections={"text": "a", "education": "b"})
+    index.add("old", signature(OTHER))
+    assert index.sections("cv") == {"text": "a", "education": "b"}
+    assert index.sections("old") is None
+    index.add("cv", signature(CV), sections={"text": "c", "education": "b"})
+    assert index.sections("cv") == {"text": "c", "education": "b"}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A small registry: one text extractor and two fields that need the Doc."""
+    extractors = pytest.importorskip("extractors")
+    calls = []
+
+    def field(name, value):
+        def fn(**inputs):
+            calls.append(name)
+            return value
+        return fn
+
+    monkeypatch.setattr(extractors, "PROVIDERS", {"doc": lambda pdoc, todo: "doc"})
+    monkeypatch.setattr(extractors, "REGISTRY", {
+        "email": extractors.Extractor("email", field("email", "new@example.com"), ["raw_text"], True),
+        "education": extractors.Extractor("education", field("education", ["fresh"]), ["doc"], True),
+        "summary": extractors.Extractor("summary", field("summary", "fresh summary"), ["doc"], False),
+    })
+    return calls
+
+
+def test_reuse_recomputes_fields_whose_section_changed(registry):
+    pipeline = pytest.importorskip("pipeline")
+    from nlp_model import ParsedDocument
+    prior = {"email": "jane@example.com", "education": ["prior"], "summary": "prior summary"}
+    prior_sections = pipeline.section_hashes(ParsedDocument(CV))
+
+    parsed, changes, reused = pipeline.reuse_near_duplicate(ParsedDocument(EDITED), prior, prior_sections)
+    # The phone number is outside the education section: only education is copied
+    assert reused == ["education"]
+    assert sorted(registry) == ["email", "summary"]
+    assert parsed == {"email": "new@example.com", "education": ["prior"], "summary": "fresh summary"}
+    assert set(changes) == {"email", "summary"}
+
+
+def test_reuse_recomputes_everything_when_education_changed(registry):
+    pipeline = pytest.importorskip("pipeline")
+    from nlp_model import ParsedDocument
+    prior = {"email": "jane@example.com", "education": ["prior"], "summary": "prior summary"}
+    prior_sections = pipeline.section_hashes(ParsedDocument(CV))
+
+    edited = CV.replace("GPA 3.8", "GPA 3.9")
+    parsed, changes, reused = pipeline.reuse_near_duplicate(ParsedDocument(edited), prior, prior_sections)
+    assert reused == []
+    assert parsed["education"] == ["fresh"]
@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytesseract")
+pytest.importorskip("pdf2image")
+import ocr  # noqa: E402
+
+
+def test_pdf_bytes_spooled_once(monkeypatch):
+    seen = []
+    monkeypatch.setattr(ocr, "ocr_page", lambda path, page, dpi, lang: seen.append(path) or f"page {page}")
+    texts = ocr.ocr_pdf(bytearray(b"%PDF-1.4 fake"), pages=[1, 2, 3], parallel=False)
+    assert texts == ["page 1", "page 2", "page 3"]
+    # Every page read the same temporary file, which is gone afterwards
+    assert len(set(seen)) == 1 and isinstance(seen[0], str)
+    assert not os.path.exists(seen[0])
+
+
+def test_as_ocr_input_accepts_bytearray():
+    pytest.importorskip("unidecode")
+    pytest.importorskip("pdfplumber")
+    from nlp_model import _as_ocr_input
+    assert _as_ocr_input(bytearray(b"%PDF")) == b"%PDF"
+    assert _as_ocr_input(Path("a.pdf")) == "a.pdf"
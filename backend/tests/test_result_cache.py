@@ -0,0 +1,68 @@
+import os
+import time
+
+from result_cache import ResultCache, content_hash
+
+
+def test_hit_after_put(tmp_path):
+    cache = ResultCache(tmp_path, "v1")
+    digest = content_hash(b"cv")
+    assert cache.get(digest) is None
+    cache.put(digest, {"name": "A"})
+    assert cache.get(digest) == {"name": "A"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_version_and_variant_separate_entries(tmp_path):
+    digest = content_hash(b"cv")
+    ResultCache(tmp_path, "v1").put(digest, {"name": "A"})
+    assert ResultCache(tmp_path, "v2").get(digest) is None
+    assert ResultCache(tmp_path, "v1").get(digest, "summarizer=bart") is None
+
+
+def test_entry_written_by_another_process(tmp_path):
+    # Two workers sharing one directory: b has never seen the key in its LRU
+    a = ResultCache(tmp_path, "v1")
+    b = ResultCache(tmp_path, "v1")
+    digest = content_hash(b"cv")
+    a.put(digest, {"name": "A"})
+    assert b.get(digest) == {"name": "A"}
+    assert b.stats()["entries"] == 1
+    # ... and it now takes part in b's eviction
+    b.max_entries = 1
+    b.put(content_hash(b"other"), {"name": "B"})
+    assert a.get(digest) is None
+
+
+def test_least_recently_used_evicted(tmp_path):
+    cache = ResultCache(tmp_path, "v1", max_entries=2)
+    first, second, third = (content_hash(bytes([i])) for i in range(3))
+    cache.put(first, 1)
+    cache.put(second, 2)
+    cache.get(first)
+    cache.put(third, 3)
+    assert cache.get(second) is None
+    assert cache.get(first) == 1
+    assert cache.get(third) == 3
+
+
+def test_lru_order_rebuilt_from_mtimes(tmp_path):
+    cache = ResultCache(tmp_path, "v1")
+    old, new = content_hash(b"old"), content_hash(b"new")
+    cache.put(old, 1)
+    cache.put(new, 2)
+    past = time.time() - 100
+    os.utime(cache._path(cache.key(old)), (past, past))
+    restarted = ResultCache(tmp_path, "v1", max_entries=2)
+    restarted.put(content_hash(b"third"), 3)
+    assert restarted.get(old) is None
+    assert restarted.get(new) == 2
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ResultCache(tmp_path, "v1")
+    digest = content_hash(b"cv")
+    cache.put(digest, {"name": "A"})
+    cache._path(cache.key(digest)).write_text("{not json", encoding="utf-8")
+    assert cache.get(digest) is None
@@ -0,0 +1,103 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from result_store import ResultStore, export
+
+PARSED = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "skills": "Python; SQL",
+    "education": [{"degree": "BSc", "gpa": "3.8"}],
+    "total_experience": 5,
+    "is_resume_probability": 0.97,
+    "new_field": {"kept": True},
+}
+
+
+def make_store(tmp_path):
+    # A long flush interval: the tests flush explicitly
+    return ResultStore(tmp_path / "results.sqlite3", version="v1", flush_seconds=3600)
+
+
+def test_round_trip_keeps_values_and_key_order(tmp_path):
+    store = make_store(tmp_path)
+    store.append("d1", PARSED, filename="cv.pdf")
+    assert store.flush() == 1
+    latest = store.latest("d1")
+    assert latest == PARSED
+    assert list(latest) == list(PARSED)
+    assert store.latest("d1", version="v2") is None
+
+
+def test_email_is_a_plain_text_column(tmp_path):
+    store = make_store(tmp_path)
+    store.append("d1", PARSED)
+    store.flush()
+    db = sqlite3.connect(store.db_path)
+    email, extra = db.execute("SELECT email, extra FROM results").fetchone()
+    db.close()
+    assert email == "jane@example.com"
+    assert json.loads(extra) == {"new_field": {"kept": True}}
+
+
+def test_value_of_unexpected_type_goes_to_extra(tmp_path):
+    store = make_store(tmp_path)
+    store.append("d1", {"total_experience": "timeout"})
+    store.flush()
+    assert store.latest("d1") == {"total_experience": "timeout"}
+
+
+def test_failed_begin_keeps_rows_and_raises_original_error(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    store.append("d1", PARSED)
+    connect = store._connect
+
+    class LockedDb:
+        def __init__(self):
+            self.db = connect()
+            self.statements = []
+
+        def execute(self, sql, *args):
+            self.statements.append(sql)
+            if sql == "BEGIN IMMEDIATE":
+                raise sqlite3.OperationalError("database is locked")
+            return self.db.execute(sql, *args)
+
+        def close(self):
+            self.db.close()
+
+    locked = LockedDb()
+    monkeypatch.setattr(store, "_connect", lambda: locked)
+    with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+        store.flush()
+    assert "ROLLBACK" not in locked.statements
+
+    monkeypatch.setattr(store, "_connect", connect)
+    assert store.stats() == {"rows": 0, "pending": 1}
+    assert store.flush() == 1
+    assert store.latest("d1") == PARSED
+
+
+def test_export_jsonl_and_csv(tmp_path):
+    store = make_store(tmp_path)
+    store.append("d1", PARSED, filename="a.pdf")
+    store.append("d2", {"name": "John"}, filename="b.pdf")
+    store.flush()
+
+    assert export(store, tmp_path / "out.jsonl") == 2
+    records = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert [r["result_id"] for r in records] == ["d1", "d2"]
+    assert records[0]["parsed_data"] == PARSED
+
+    assert export(store, tmp_path / "out.csv", since_id=1) == 1
+    with open(tmp_path / "out.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["result_id"], r["name"]) for r in rows] == [("d2", "John")]
+
+
+def test_export_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export(make_store(tmp_path), tmp_path / "out.xml")
@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+
+from search_index import SearchIndex
+
+PARSED = {"name": "Jane Doe", "designation": "Data Engineer", "skills": "Python; SQL",
+          "past_companies": ["Acme Inc"], "total_experience": 5}
+
+
+def test_add_and_search(tmp_path):
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    index.add("d1", PARSED, text="Built pipelines", filename="cv.pdf")
+    hits = index.search(q="engineer")
+    assert [h["result_id"] for h in hits] == ["d1"]
+
+
+def test_failed_begin_raises_the_original_error(tmp_path, monkeypatch):
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    connect = index._connect
+    statements = []
+
+    class LockedDb:
+        def __init__(self):
+            self.db = connect()
+
+        def execute(self, sql, *args):
+            statements.append(sql)
+            if sql == "BEGIN IMMEDIATE":
+                raise sqlite3.OperationalError("database is locked")
+            return self.db.execute(sql, *args)
+
+        def close(self):
+            self.db.close()
+
+    monkeypatch.setattr(index, "_connect", LockedDb)
+    with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+        index.add("d1", PARSED)
+    assert "ROLLBACK" not in statements
@@ -0,0 +1,57 @@
+import json
+import logging
+
+import pytest
+
+skills_index = pytest.importorskip("skills_index")
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    vocab, index = tmp_path / "skills.txt", tmp_path / "skills.index.json"
+    monkeypatch.setattr(skills_index, "SKILLS_FILE", vocab)
+    monkeypatch.setattr(skills_index, "SKILLS_INDEX", index)
+    monkeypatch.setattr(skills_index, "RELOAD_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(skills_index, "_current", None)
+    return vocab, index
+
+
+def write_index(path, skills):
+    path.write_text(json.dumps({
+        "format": skills_index.INDEX_FORMAT, "vocab_sha256": "ab" * 32, "built_at": 0,
+        "max_tokens": max(len(s.split()) for s in skills), "skills": skills,
+    }), encoding="utf-8")
+
+
+def test_current_without_an_index_is_empty_and_builds_nothing(paths, caplog):
+    vocab, index = paths
+    vocab.write_text("Python\n", encoding="utf-8")
+    with caplog.at_level(logging.WARNING, logger="skills_index"):
+        current = skills_index.current()
+    assert len(current) == 0 and current.version == "none"
+    assert not index.exists()
+    assert "python skills_index.py build" in caplog.text
+
+
+def test_current_picks_up_an_index_built_later(paths):
+    _, index = paths
+    assert skills_index.current().version == "none"
+    write_index(index, {"python": "Python", "machine learning": "Machine Learning"})
+    current = skills_index.current()
+    assert len(current) == 2 and current.version == "abababababababab"
+
+
+def test_build_cli_reports_a_missing_vocabulary(paths, capsys):
+    vocab, _ = paths
+    assert skills_index.main(["build", str(vocab)]) == 1
+    assert "No skills vocabulary" in capsys.readouterr().err
+
+
+def test_version_is_read_without_loading_the_index(paths, monkeypatch):
+    _, index = paths
+    monkeypatch.setattr(skills_index, "_version", (None, "none"))
+    assert skills_index.version() == "none"
+    write_index(index, {"python": "Python"})
+    assert skills_index.version() == "abababababababab"
+    assert skills_index._current is None
+    assert skills_index.version() == skills_index.current().version
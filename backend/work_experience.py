@@ -1,15 +1,20 @@
 # work_experience_extractor.py
 import re
-import spacy
 
-nlp = spacy.load("en_core_web_md")
+import metrics
 
+from models import spacy_doc
+
+@metrics.timed("extract_total_experience")
 def extract_total_experience(text: str):
     matches = re.findall(r"(\d+)\+?\s+(years|yrs)\s+of\s+experience", text, re.IGNORECASE)
     return max([int(m[0]) for m in matches], default=None) if matches else None
 
-def extract_work_experience(text: str):
-    doc = nlp(text)
+@metrics.timed("extract_work_experience")
+def extract_work_experience(text: str, doc=None):
+    # `doc` is the shared Doc of the CV when called from the pipeline
+    if doc is None:
+        doc = spacy_doc(text, ["sents"])
     jobs = []
     for sent in doc.sents:
         if re.search(r"(experience|worked|employed|internship|position)", sent.text, re.I):